@@ -6,7 +6,7 @@ import logging
 import re
 from pathlib import Path
 from typing import List, Union, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, InitVar
 
 # Load environment variables from unified .env file
 try:
@@ -93,9 +93,15 @@ class Config:
     # Build & Development
     debug: bool = False
     build_version: str = "1.0.0"
+
+    # Skip environment loading (see for_testing)
+    load_env: InitVar[bool] = True
     
-    def __post_init__(self):
+    def __post_init__(self, load_env: bool = True):
         """Load configuration from environment variables."""
+        if not load_env:
+            return
+
         # API Keys
         self.openai_api_key = os.environ.get('OPENAI_API_KEY')
         self.google_api_key = os.environ.get('GOOGLE_API_KEY')
@@ -172,6 +178,11 @@ class Config:
         # Set environment variables (for backward compatibility)
         self._set_env_vars()
     
+    @classmethod
+    def for_testing(cls, **overrides: Any) -> "Config":
+        """Create a configuration without reading or writing os.environ."""
+        return cls(load_env=False, **overrides)
+
     def _set_env_vars(self):
         """Set environment variables for backward compatibility."""
         env_mappings = {
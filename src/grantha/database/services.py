@@ -2,10 +2,11 @@
 
 import uuid
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, desc, func
+from sqlalchemy import select, insert, and_, or_, desc, func
 from sqlalchemy.orm import selectinload
 
 from .models import User, RefreshToken, AuthEvent
@@ -473,6 +474,52 @@ class AuthEventService:
             logger.error(f"Failed to log auth event: {e}")
             raise
     
+    @staticmethod
+    async def log_events(session: AsyncSession, events: List[Dict[str, Any]]) -> int:
+        """Log several authentication events with a single INSERT and commit.
+        
+        Each item takes the same keyword arguments as ``log_event``.
+        """
+        if not events:
+            return 0
+        
+        try:
+            rows = []
+            for event in events:
+                row = dict(event)
+                user_id = row.get("user_id")
+                row["user_id"] = uuid.UUID(user_id) if user_id and isinstance(user_id, str) else user_id
+                event_metadata = row.get("event_metadata")
+                row["event_metadata"] = str(event_metadata) if event_metadata else None
+                rows.append(row)
+            
+            await session.execute(insert(AuthEvent), rows)
+            await session.commit()
+            
+            return len(rows)
+            
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Failed to log auth events: {e}")
+            raise
+    
+    @staticmethod
+    @asynccontextmanager
+    async def batch_events(session: AsyncSession) -> AsyncIterator[Callable[..., None]]:
+        """Buffer events added inside the block and flush them with ``log_events`` on exit.
+        
+        Yields an ``add(**event)`` callable taking ``log_event`` keyword
+        arguments. Nothing is written if the block raises.
+        """
+        buffer: List[Dict[str, Any]] = []
+        
+        def add(**event: Any) -> None:
+            buffer.append(event)
+        
+        yield add
+        
+        await AuthEventService.log_events(session, buffer)
+    
     @staticmethod
     async def get_user_events(
         session: AsyncSession,
@@ -1,41 +1,112 @@
 """Authentication test configuration and fixtures."""
 
-import asyncio
+import functools
+import itertools
+import logging
 import os
 import pytest
 import tempfile
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from typing import AsyncGenerator, Dict, Any
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 
 import pytest_asyncio
+from passlib.context import CryptContext
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 # Set test environment
 os.environ["TESTING"] = "1"
 os.environ["SECRET_KEY"] = "test_secret_key_for_jwt"
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
 
-from src.grantha.database.models import User, RefreshToken, AuthEvent
+from src.grantha.database.models import User, RefreshToken
 from src.grantha.database.base import Base
 from src.grantha.database.services import UserService, RefreshTokenService, AuthEventService
 from src.grantha.database.auth_service import DatabaseJWTService
 
 
-@pytest_asyncio.fixture
+def pytest_configure(config):
+    """Quiet SQLAlchemy loggers once per process."""
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    logging.getLogger("sqlalchemy.pool").setLevel(logging.WARNING)
+
+
+# Low-cost bcrypt for fixture users; the production context still verifies
+# these hashes because bcrypt stores the cost factor inside the hash.
+_fixture_pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+@functools.lru_cache(maxsize=None)
+def fixture_password_hash(password: str) -> str:
+    """Hash a fixture password once per session at bcrypt cost 4."""
+    return _fixture_pwd_context.hash(password)
+
+
+@contextmanager
+def fast_password_hashing():
+    """Use ``fixture_password_hash`` for users created inside the block."""
+    with patch.object(User, "hash_password", staticmethod(fixture_password_hash)):
+        yield
+
+
+@pytest.fixture(scope="session")
+def uuid_pool():
+    """Preallocate random UUIDs from a single ``os.urandom`` call."""
+    count = 10000
+    buf = os.urandom(16 * count)
+    return [uuid.UUID(bytes=buf[i * 16:(i + 1) * 16], version=4) for i in range(count)]
+
+
+@pytest.fixture(scope="session")
+def uuid_gen(uuid_pool):
+    """Session-wide iterator over ``uuid_pool``; use ``next(uuid_gen)``.
+    
+    Shared across tests so no UUID is handed out twice, falling back to
+    ``uuid.uuid4()`` once the pool is exhausted.
+    """
+    return itertools.chain(uuid_pool, iter(uuid.uuid4, None))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def test_engine():
-    """Create test database engine."""
+    """Create the test database engine and schema once per test session.
+    
+    Under ``pytest -n`` every xdist worker is a separate process, so each one
+    gets its own private in-memory database; shared-cache memory databases
+    are only visible within the process that opened them.
+    """
     engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
+        # Named shared-cache memory database held open by the single pooled
+        # connection, so its page cache stays hot for the whole session
+        "sqlite+aiosqlite:///file:grantha_auth_tests?mode=memory&cache=shared&uri=true",
         echo=False,
         poolclass=StaticPool,
+        query_cache_size=1200,
         connect_args={
             "check_same_thread": False,
         },
     )
     
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest correctly
+        dbapi_connection.isolation_level = None
+        
+        # Nothing here needs durability; keep journal and temp data in memory
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -45,15 +116,69 @@ async def test_engine():
     await engine.dispose()
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session."""
-    async_session = async_sessionmaker(
-        test_engine, class_=AsyncSession, expire_on_commit=False
+    """Create a test database session isolated by an outer transaction.
+    
+    Service-level ``commit()``/``rollback()`` calls only release or roll back
+    a SAVEPOINT, and the outer transaction is rolled back once the test ends,
+    so the shared schema is reused without leaking rows between tests.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def pooled_session_factory(tmp_path_factory) -> AsyncGenerator[async_sessionmaker, None]:
+    """Session factory backed by a pooled file database for concurrency tests.
+    
+    Unlike ``test_session``, each session checks out its own connection, so
+    concurrent tasks exercise real pooled behaviour. Rows are committed and
+    persist for the whole test session; use unique identifiers.
+    """
+    db_path = tmp_path_factory.mktemp("pooled_db") / "concurrency.db"
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=10,
+        connect_args={
+            "timeout": 30,
+        },
     )
     
-    async with async_session() as session:
-        yield session
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        # Take the write lock up front so concurrent writers wait on the busy
+        # timeout instead of failing when a read transaction upgrades
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    
+    await engine.dispose()
 
 
 @pytest.fixture
@@ -81,45 +206,49 @@ def sample_admin_data():
     }
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def test_user(test_session: AsyncSession, sample_user_data) -> User:
     """Create a test user."""
-    user = await UserService.create_user(
-        session=test_session,
-        **sample_user_data
-    )
+    with fast_password_hashing():
+        user = await UserService.create_user(
+            session=test_session,
+            **sample_user_data
+        )
     return user
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def test_admin(test_session: AsyncSession, sample_admin_data) -> User:
     """Create a test admin user."""
-    admin = await UserService.create_user(
-        session=test_session,
-        **sample_admin_data
-    )
+    with fast_password_hashing():
+        admin = await UserService.create_user(
+            session=test_session,
+            **sample_admin_data
+        )
     return admin
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def verified_user(test_session: AsyncSession, sample_user_data) -> User:
     """Create a verified test user."""
     data = sample_user_data.copy()
     data['is_verified'] = True
-    user = await UserService.create_user(
-        session=test_session,
-        **data
-    )
+    with fast_password_hashing():
+        user = await UserService.create_user(
+            session=test_session,
+            **data
+        )
     return user
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def locked_user(test_session: AsyncSession, sample_user_data) -> User:
     """Create a locked test user."""
-    user = await UserService.create_user(
-        session=test_session,
-        **sample_user_data
-    )
+    with fast_password_hashing():
+        user = await UserService.create_user(
+            session=test_session,
+            **sample_user_data
+        )
     
     # Lock the account
     user.increment_failed_login(max_attempts=3, lockout_duration_minutes=30)
@@ -128,10 +257,10 @@ async def locked_user(test_session: AsyncSession, sample_user_data) -> User:
     return user
 
 
-@pytest_asyncio.fixture
-async def test_refresh_token(test_session: AsyncSession, test_user: User) -> RefreshToken:
+@pytest_asyncio.fixture(loop_scope="session")
+async def test_refresh_token(test_session: AsyncSession, test_user: User, uuid_gen) -> RefreshToken:
     """Create a test refresh token."""
-    token_id = str(uuid.uuid4())
+    token_id = str(next(uuid_gen))
     expires_at = datetime.now(timezone.utc) + timedelta(days=7)
     
     refresh_token = await RefreshTokenService.create_refresh_token(
@@ -146,6 +275,18 @@ async def test_refresh_token(test_session: AsyncSession, test_user: User) -> Ref
     return refresh_token
 
 
+@pytest.fixture
+def test_user_id(test_user: User) -> str:
+    """String form of ``test_user.id``, formatted once per test."""
+    return str(test_user.id)
+
+
+@pytest.fixture
+def test_refresh_token_id(test_refresh_token: RefreshToken) -> str:
+    """Token id of ``test_refresh_token``."""
+    return test_refresh_token.token_id
+
+
 @pytest.fixture
 def jwt_service():
     """JWT service instance for testing."""
@@ -204,54 +345,52 @@ def sample_password_change_request():
     }
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def multiple_users(test_session: AsyncSession):
-    """Create multiple test users."""
-    users = []
-    
-    for i in range(5):
-        user_data = {
+    """Create multiple test users with a single bulk INSERT."""
+    rows = [
+        {
             "username": f"user{i}",
-            "password": f"pass{i}123",
+            "password_hash": fixture_password_hash(f"pass{i}123"),
             "email": f"user{i}@example.com",
             "full_name": f"User {i}"
         }
-        user = await UserService.create_user(session=test_session, **user_data)
-        users.append(user)
+        for i in range(5)
+    ]
+    
+    result = await test_session.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True), rows
+    )
+    users = result.all()
+    await test_session.commit()
     
     return users
 
 
-@pytest_asyncio.fixture
-async def multiple_refresh_tokens(test_session: AsyncSession, test_user: User):
-    """Create multiple refresh tokens for a user."""
-    tokens = []
+@pytest_asyncio.fixture(loop_scope="session")
+async def multiple_refresh_tokens(test_session: AsyncSession, test_user: User, uuid_gen):
+    """Create multiple refresh tokens for a user with a single bulk INSERT."""
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    rows = [
+        {
+            "token_id": str(next(uuid_gen)),
+            "user_id": test_user.id,
+            "expires_at": expires_at,
+            "ip_address": f"192.168.1.{i+1}",
+            "user_agent": f"browser-{i}/1.0"
+        }
+        for i in range(3)
+    ]
     
-    for i in range(3):
-        token_id = str(uuid.uuid4())
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-        
-        token = await RefreshTokenService.create_refresh_token(
-            session=test_session,
-            user_id=str(test_user.id),
-            token_id=token_id,
-            expires_at=expires_at,
-            ip_address=f"192.168.1.{i+1}",
-            user_agent=f"browser-{i}/1.0"
-        )
-        tokens.append(token)
+    result = await test_session.scalars(
+        insert(RefreshToken).returning(RefreshToken, sort_by_parameter_order=True), rows
+    )
+    tokens = result.all()
+    await test_session.commit()
     
     return tokens
 
 
-@pytest.fixture(autouse=True)
-def setup_test_logging():
-    """Configure logging for tests."""
-    import logging
-    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-    logging.getLogger("sqlalchemy.pool").setLevel(logging.WARNING)
-
-
 # Rate limiting and security fixtures
 @pytest.fixture
 def rate_limit_attempts():
@@ -319,26 +458,48 @@ def browser_environment():
 
 
 # Test data generators
-@pytest.fixture
+@functools.lru_cache(maxsize=256)
+def _user_data_template(username: str, email: str, password: str, extra: tuple) -> Dict[str, Any]:
+    """Build user data once per distinct set of factory arguments."""
+    return {
+        "username": username,
+        "email": email or f"{username}@example.com",
+        "password": password,
+        "full_name": f"Test {username.title()}",
+        "bio": f"Bio for {username}",
+        **dict(extra)
+    }
+
+
+@pytest.fixture(scope="session")
 def user_data_factory():
-    """Factory for generating test user data."""
+    """Factory for generating test user data.
+    
+    Explicit-username calls are memoized on their arguments; every call
+    returns a fresh copy so tests may mutate the result.
+    """
     def _create_user_data(
         username: str = None,
         email: str = None,
         password: str = "testpass123",
         **kwargs
     ) -> Dict[str, Any]:
-        base_username = username or f"user_{uuid.uuid4().hex[:8]}"
-        base_email = email or f"{base_username}@example.com"
+        extra = tuple(sorted(kwargs.items()))
+
+        if not username:
+            # Random users are unique per call, so caching them only
+            # fills the cache with entries that are never hit
+            template = _user_data_template.__wrapped__(
+                f"user_{uuid.uuid4().hex[:8]}", email, password, extra
+            )
+        else:
+            try:
+                template = _user_data_template(username, email, password, extra)
+            except TypeError:
+                # Unhashable keyword values bypass the cache
+                template = _user_data_template.__wrapped__(username, email, password, extra)
         
-        return {
-            "username": base_username,
-            "email": base_email,
-            "password": password,
-            "full_name": f"Test {base_username.title()}",
-            "bio": f"Bio for {base_username}",
-            **kwargs
-        }
+        return dict(template)
     
     return _create_user_data
 
@@ -360,25 +521,4 @@ def token_data_factory():
             **kwargs
         }
     
-    return _create_token_data
-
-
-# Async helper fixtures
-@pytest.fixture
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
-
-
-# Cleanup fixtures
-@pytest_asyncio.fixture
-async def cleanup_auth_events(test_session: AsyncSession):
-    """Clean up auth events after tests."""
-    yield
-    
-    # Clean up auth events created during tests
-    from sqlalchemy import delete
-    await test_session.execute(delete(AuthEvent))
-    await test_session.commit()
\ No newline at end of file
+    return _create_token_data
\ No newline at end of file
@@ -34,7 +34,7 @@ def mock_db_dependency(test_session):
     return get_test_db
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestUserRegistration:
     """Test user registration endpoints."""
     
@@ -90,7 +90,7 @@ class TestUserRegistration:
                 assert response.status_code in [400, 422]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestUserLogin:
     """Test user login endpoints."""
     
@@ -160,7 +160,7 @@ class TestUserLogin:
                 assert response.status_code == 422  # Validation error
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestTokenRefresh:
     """Test token refresh endpoints."""
     
@@ -205,7 +205,7 @@ class TestTokenRefresh:
         assert response.status_code == 422
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestUserLogout:
     """Test user logout endpoints."""
     
@@ -275,7 +275,7 @@ class TestUserLogout:
         assert response.status_code in [200, 401]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestUserProfile:
     """Test user profile endpoints."""
     
@@ -362,7 +362,7 @@ class TestUserProfile:
             assert data["full_name"] == "Updated Name"
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestPasswordChange:
     """Test password change endpoints."""
     
@@ -422,7 +422,7 @@ class TestPasswordChange:
         assert response.status_code == 400
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestSessionManagement:
     """Test session management endpoints."""
     
@@ -494,7 +494,7 @@ class TestSessionManagement:
         assert response.status_code == 404
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestLegacyCompatibility:
     """Test legacy compatibility endpoints."""
     
@@ -536,7 +536,7 @@ class TestLegacyCompatibility:
             assert "is_expired" in data
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAPIErrorHandling:
     """Test API error handling."""
     
@@ -588,7 +588,7 @@ class TestAPIErrorHandling:
         assert response.status_code in [200, 400, 413, 422]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAPIRateLimiting:
     """Test API rate limiting behavior."""
     
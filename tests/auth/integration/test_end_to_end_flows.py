@@ -10,7 +10,7 @@ from src.grantha.database.auth_service import DatabaseJWTService
 from src.grantha.database.models import User, RefreshToken, AuthEvent
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestCompleteAuthenticationFlow:
     """Test complete authentication workflows."""
     
@@ -274,7 +274,7 @@ class TestCompleteAuthenticationFlow:
             assert payload["user_id"] == str(test_user.id)
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestSecurityWorkflows:
     """Test security-related workflows."""
     
@@ -487,7 +487,7 @@ class TestSecurityWorkflows:
         assert expiring_soon_token.is_active is True  # Should still be active
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestErrorRecoveryWorkflows:
     """Test error recovery and resilience workflows."""
     
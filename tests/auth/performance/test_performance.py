@@ -12,7 +12,7 @@ from src.grantha.database.auth_service import DatabaseJWTService
 from src.grantha.database.models import User
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAuthenticationPerformance:
     """Test authentication performance characteristics."""
     
@@ -311,7 +311,7 @@ class TestAuthenticationPerformance:
         print(f"Time per token: {time_per_token:.3f}s")
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestScalabilityLimits:
     """Test system scalability and limits."""
     
@@ -503,7 +503,7 @@ class TestScalabilityLimits:
         print(f"User events: {len(user_events)}, Security events: {len(security_events)}")
 
 
-@pytest.mark.asyncio 
+@pytest.mark.asyncio(loop_scope="session")
 class TestMemoryUsage:
     """Test memory usage patterns."""
     
@@ -610,7 +610,7 @@ class TestMemoryUsage:
         print(f"Memory per session: {memory_per_session:.0f} bytes")
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestCachePerformance:
     """Test caching and performance optimizations."""
     
@@ -13,7 +13,7 @@ from src.grantha.database.services import UserService, AuthEventService
 from src.grantha.database.auth_service import DatabaseJWTService
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestPasswordSecurity:
     """Test password security features."""
     
@@ -104,7 +104,7 @@ class TestPasswordSecurity:
         await test_session.commit()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestJWTSecurity:
     """Test JWT token security features."""
     
@@ -269,7 +269,7 @@ class TestJWTSecurity:
         assert payload1["jti"] != payload2["jti"]
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAccountLockoutSecurity:
     """Test account lockout security features."""
     
@@ -362,7 +362,7 @@ class TestAccountLockoutSecurity:
                     assert success is False  # Should respect lockout
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestSessionSecurity:
     """Test session security features."""
     
@@ -479,7 +479,7 @@ class TestSessionSecurity:
         assert expired_token.revoke_reason == "expired"
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestInputValidationSecurity:
     """Test input validation security measures."""
     
@@ -607,7 +607,7 @@ class TestInputValidationSecurity:
         assert time_diff < timedelta(minutes=1)  # Should be recent
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAuditAndMonitoring:
     """Test audit trail and monitoring security features."""
     
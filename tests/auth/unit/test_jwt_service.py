@@ -11,7 +11,7 @@ from src.grantha.utils.jwt_service import JWTService
 from src.grantha.database.models import User, RefreshToken
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestDatabaseJWTService:
     """Test DatabaseJWTService functionality."""
     
@@ -495,7 +495,7 @@ class TestLegacyJWTService:
         assert "is_revoked" in info
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestJWTServiceEdgeCases:
     """Test edge cases and error scenarios."""
     
@@ -5,11 +5,14 @@ import uuid
 from datetime import datetime, timezone, timedelta
 from unittest.mock import patch
 
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
 from src.grantha.database.services import UserService, RefreshTokenService, AuthEventService
 from src.grantha.database.models import User, RefreshToken, AuthEvent
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestUserService:
     """Test UserService functionality."""
     
@@ -34,9 +37,14 @@ class TestUserService:
         # Create first user
         await UserService.create_user(session=test_session, **sample_user_data)
         
-        # Try to create duplicate
-        with pytest.raises(Exception):  # Should raise IntegrityError
-            await UserService.create_user(session=test_session, **sample_user_data)
+        # Try to create duplicate; the savepoint keeps the rollback local
+        async with test_session.begin_nested():
+            with pytest.raises(IntegrityError):
+                await UserService.create_user(session=test_session, **sample_user_data)
+        
+        # Outer transaction is still usable
+        user = await UserService.get_user_by_username(test_session, sample_user_data["username"])
+        assert user is not None
     
     async def test_create_user_duplicate_email(self, test_session, sample_user_data):
         """Test creating user with duplicate email fails."""
@@ -47,12 +55,16 @@ class TestUserService:
         duplicate_data = sample_user_data.copy()
         duplicate_data["username"] = "different_username"
         
-        with pytest.raises(Exception):  # Should raise IntegrityError
-            await UserService.create_user(session=test_session, **duplicate_data)
+        async with test_session.begin_nested():
+            with pytest.raises(IntegrityError):
+                await UserService.create_user(session=test_session, **duplicate_data)
+        
+        user = await UserService.get_user_by_username(test_session, sample_user_data["username"])
+        assert user is not None
     
-    async def test_get_user_by_id(self, test_session, test_user):
+    async def test_get_user_by_id(self, test_session, test_user, test_user_id):
         """Test getting user by ID."""
-        user_id = str(test_user.id)
+        user_id = test_user_id
         retrieved_user = await UserService.get_user_by_id(test_session, user_id)
         
         assert retrieved_user is not None
@@ -148,7 +160,7 @@ class TestUserService:
         assert user is not None
         assert user.is_locked()
     
-    async def test_update_user(self, test_session, test_user):
+    async def test_update_user(self, test_session, test_user_id):
         """Test updating user information."""
         updates = {
             "full_name": "Updated Name",
@@ -158,7 +170,7 @@ class TestUserService:
         
         updated_user = await UserService.update_user(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             **updates
         )
         
@@ -167,13 +179,13 @@ class TestUserService:
         assert updated_user.bio == "Updated bio"
         assert updated_user.email == "updated@example.com"
     
-    async def test_update_user_password(self, test_session, test_user):
+    async def test_update_user_password(self, test_session, test_user_id):
         """Test updating user password."""
         new_password = "newpassword123"
         
         updated_user = await UserService.update_user(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             password=new_password
         )
         
@@ -181,22 +193,26 @@ class TestUserService:
         assert updated_user.verify_password(new_password)
         assert not updated_user.verify_password("testpass123")  # Old password
     
-    async def test_deactivate_user(self, test_session, test_user, multiple_refresh_tokens):
+    async def test_deactivate_user(self, test_session, test_user, test_user_id, multiple_refresh_tokens):
         """Test deactivating user account."""
         success = await UserService.deactivate_user(
             session=test_session,
-            user_id=str(test_user.id)
+            user_id=test_user_id
         )
         
         assert success is True
         
         # Check user is deactivated
-        deactivated_user = await UserService.get_user_by_id(test_session, str(test_user.id))
+        deactivated_user = await UserService.get_user_by_id(test_session, test_user_id)
         assert deactivated_user.is_active is False
         
-        # Check refresh tokens are revoked
+        # Check refresh tokens are revoked, re-reading them in one SELECT
+        await test_session.execute(
+            select(RefreshToken)
+            .where(RefreshToken.user_id == test_user.id)
+            .execution_options(populate_existing=True)
+        )
         for token in multiple_refresh_tokens:
-            await test_session.refresh(token)
             assert token.is_revoked is True
     
     async def test_list_users(self, test_session, multiple_users):
@@ -221,18 +237,18 @@ class TestUserService:
         assert len(more_users) == 3  # Remaining users
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestRefreshTokenService:
     """Test RefreshTokenService functionality."""
     
-    async def test_create_refresh_token(self, test_session, test_user):
+    async def test_create_refresh_token(self, test_session, test_user, test_user_id):
         """Test creating refresh token."""
         token_id = str(uuid.uuid4())
         expires_at = datetime.now(timezone.utc) + timedelta(days=7)
         
         token = await RefreshTokenService.create_refresh_token(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             token_id=token_id,
             expires_at=expires_at,
             ip_address="127.0.0.1",
@@ -248,28 +264,28 @@ class TestRefreshTokenService:
         assert token.device_fingerprint == "device-123"
         assert token.is_active is True
     
-    async def test_get_refresh_token(self, test_session, test_refresh_token):
+    async def test_get_refresh_token(self, test_session, test_refresh_token, test_refresh_token_id):
         """Test getting refresh token by ID."""
         token = await RefreshTokenService.get_refresh_token(
             session=test_session,
-            token_id=test_refresh_token.token_id
+            token_id=test_refresh_token_id
         )
         
         assert token is not None
         assert token.id == test_refresh_token.id
-        assert token.token_id == test_refresh_token.token_id
+        assert token.token_id == test_refresh_token_id
     
-    async def test_validate_refresh_token_valid(self, test_session, test_refresh_token):
+    async def test_validate_refresh_token_valid(self, test_session, test_refresh_token_id):
         """Test validating valid refresh token."""
         token = await RefreshTokenService.validate_refresh_token(
             session=test_session,
-            token_id=test_refresh_token.token_id
+            token_id=test_refresh_token_id
         )
         
         assert token is not None
         assert token.is_valid()
     
-    async def test_validate_refresh_token_revoked(self, test_session, test_refresh_token):
+    async def test_validate_refresh_token_revoked(self, test_session, test_refresh_token, test_refresh_token_id):
         """Test validating revoked refresh token."""
         # Revoke the token first
         test_refresh_token.revoke("test")
@@ -277,12 +293,12 @@ class TestRefreshTokenService:
         
         token = await RefreshTokenService.validate_refresh_token(
             session=test_session,
-            token_id=test_refresh_token.token_id
+            token_id=test_refresh_token_id
         )
         
         assert token is None  # Should return None for invalid token
     
-    async def test_validate_refresh_token_expired(self, test_session, test_user):
+    async def test_validate_refresh_token_expired(self, test_session, test_user_id):
         """Test validating expired refresh token."""
         # Create expired token
         token_id = str(uuid.uuid4())
@@ -290,7 +306,7 @@ class TestRefreshTokenService:
         
         expired_token = await RefreshTokenService.create_refresh_token(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             token_id=token_id,
             expires_at=expires_at
         )
@@ -302,27 +318,26 @@ class TestRefreshTokenService:
         
         assert token is None  # Should return None for expired token
     
-    async def test_revoke_refresh_token(self, test_session, test_refresh_token):
+    async def test_revoke_refresh_token(self, test_session, test_refresh_token, test_refresh_token_id):
         """Test revoking refresh token."""
         success = await RefreshTokenService.revoke_refresh_token(
             session=test_session,
-            token_id=test_refresh_token.token_id,
+            token_id=test_refresh_token_id,
             reason="manual_revoke"
         )
         
         assert success is True
         
-        # Refresh token from database
-        await test_session.refresh(test_refresh_token)
+        # Same identity-mapped instance the service revoked
         assert test_refresh_token.is_revoked is True
         assert test_refresh_token.revoke_reason == "manual_revoke"
         assert test_refresh_token.revoked_at is not None
     
-    async def test_revoke_all_user_tokens(self, test_session, test_user, multiple_refresh_tokens):
+    async def test_revoke_all_user_tokens(self, test_session, test_user_id, multiple_refresh_tokens):
         """Test revoking all tokens for a user."""
         revoked_count = await RefreshTokenService.revoke_all_user_tokens(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             reason="logout_all"
         )
         
@@ -330,24 +345,23 @@ class TestRefreshTokenService:
         
         # Check all tokens are revoked
         for token in multiple_refresh_tokens:
-            await test_session.refresh(token)
             assert token.is_revoked is True
             assert token.revoke_reason == "logout_all"
     
-    async def test_cleanup_expired_tokens(self, test_session, test_user):
+    async def test_cleanup_expired_tokens(self, test_session, test_user_id, uuid_gen):
         """Test cleaning up expired tokens."""
         # Create a mix of valid and expired tokens
         valid_token = await RefreshTokenService.create_refresh_token(
             session=test_session,
-            user_id=str(test_user.id),
-            token_id=str(uuid.uuid4()),
+            user_id=test_user_id,
+            token_id=str(next(uuid_gen)),
             expires_at=datetime.now(timezone.utc) + timedelta(days=7)
         )
         
         expired_token = await RefreshTokenService.create_refresh_token(
             session=test_session,
-            user_id=str(test_user.id),
-            token_id=str(uuid.uuid4()),
+            user_id=test_user_id,
+            token_id=str(next(uuid_gen)),
             expires_at=datetime.now(timezone.utc) - timedelta(days=1)
         )
         
@@ -356,14 +370,11 @@ class TestRefreshTokenService:
         assert cleanup_count == 1  # Only expired token should be cleaned up
         
         # Check tokens
-        await test_session.refresh(valid_token)
-        await test_session.refresh(expired_token)
-        
         assert valid_token.is_revoked is False
         assert expired_token.is_revoked is True
         assert expired_token.revoke_reason == "expired"
     
-    async def test_get_user_active_tokens(self, test_session, test_user, multiple_refresh_tokens):
+    async def test_get_user_active_tokens(self, test_session, test_user_id, multiple_refresh_tokens):
         """Test getting active tokens for a user."""
         # Revoke one token
         await RefreshTokenService.revoke_refresh_token(
@@ -374,7 +385,7 @@ class TestRefreshTokenService:
         
         active_tokens = await RefreshTokenService.get_user_active_tokens(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             limit=10
         )
         
@@ -382,16 +393,16 @@ class TestRefreshTokenService:
         assert all(token.is_active for token in active_tokens)
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestAuthEventService:
     """Test AuthEventService functionality."""
     
-    async def test_log_event(self, test_session, test_user):
+    async def test_log_event(self, test_session, test_user, test_user_id):
         """Test logging auth events."""
         event = await AuthEventService.log_event(
             session=test_session,
             event_type="login",
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             success=True,
             ip_address="127.0.0.1",
             user_agent="test-browser",
@@ -420,34 +431,62 @@ class TestAuthEventService:
         assert event.success is False
         assert event.failure_reason == "user_not_found"
     
-    async def test_get_user_events(self, test_session, test_user):
-        """Test getting events for a user."""
-        # Create multiple events
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=str(test_user.id),
-            success=True
-        )
+    async def test_log_events_bulk(self, test_session, test_user_id):
+        """Test logging several events in one call."""
+        count = await AuthEventService.log_events(test_session, [
+            {"event_type": "login", "user_id": test_user_id, "success": True,
+             "event_metadata": {"device": "mobile"}},
+            {"event_type": "login", "user_id": None, "success": False,
+             "failure_reason": "user_not_found"},
+        ])
         
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="logout",
-            user_id=str(test_user.id),
-            success=True
-        )
+        assert count == 2
         
-        await AuthEventService.log_event(
+        events = await AuthEventService.get_user_events(
             session=test_session,
-            event_type="password_change",
-            user_id=str(test_user.id),
-            success=True
+            user_id=test_user_id
         )
         
+        assert len(events) == 1
+        assert "device" in events[0].event_metadata
+        assert await AuthEventService.log_events(test_session, []) == 0
+    
+    async def test_batch_events(self, test_session, test_user_id):
+        """Test buffering events and flushing them on exit."""
+        async with AuthEventService.batch_events(test_session) as add:
+            add(event_type="login", user_id=test_user_id, success=True)
+            add(event_type="logout", user_id=test_user_id, success=True)
+            
+            # Nothing is written until the block exits
+            pending = await AuthEventService.get_user_events(test_session, test_user_id)
+            assert pending == []
+        
+        events = await AuthEventService.get_user_events(test_session, test_user_id)
+        assert {event.event_type for event in events} == {"login", "logout"}
+    
+    async def test_batch_events_discarded_on_error(self, test_session, test_user_id):
+        """Test that a failing block writes no events."""
+        with pytest.raises(RuntimeError):
+            async with AuthEventService.batch_events(test_session) as add:
+                add(event_type="login", user_id=test_user_id, success=True)
+                raise RuntimeError("boom")
+        
+        events = await AuthEventService.get_user_events(test_session, test_user_id)
+        assert events == []
+    
+    async def test_get_user_events(self, test_session, test_user, test_user_id):
+        """Test getting events for a user."""
+        # Create multiple events
+        await AuthEventService.log_events(test_session, [
+            {"event_type": "login", "user_id": test_user_id, "success": True},
+            {"event_type": "logout", "user_id": test_user_id, "success": True},
+            {"event_type": "password_change", "user_id": test_user_id, "success": True},
+        ])
+        
         # Get all events
         events = await AuthEventService.get_user_events(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             limit=10
         )
         
@@ -457,37 +496,22 @@ class TestAuthEventService:
         # Get specific event type
         login_events = await AuthEventService.get_user_events(
             session=test_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             event_type="login"
         )
         
         assert len(login_events) == 1
         assert login_events[0].event_type == "login"
     
-    async def test_get_security_events(self, test_session, test_user):
+    async def test_get_security_events(self, test_session, test_user_id):
         """Test getting security-relevant events."""
         # Create various events
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=str(test_user.id),
-            success=False,
-            failure_reason="invalid_password"
-        )
-        
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=str(test_user.id),
-            success=True
-        )
-        
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="password_change",
-            user_id=str(test_user.id),
-            success=True
-        )
+        await AuthEventService.log_events(test_session, [
+            {"event_type": "login", "user_id": test_user_id, "success": False,
+             "failure_reason": "invalid_password"},
+            {"event_type": "login", "user_id": test_user_id, "success": True},
+            {"event_type": "password_change", "user_id": test_user_id, "success": True},
+        ])
         
         security_events = await AuthEventService.get_security_events(
             session=test_session,
@@ -502,31 +526,16 @@ class TestAuthEventService:
         assert "login" in event_types
         assert "password_change" in event_types
     
-    async def test_get_failed_login_stats(self, test_session, test_user, cleanup_auth_events):
+    async def test_get_failed_login_stats(self, test_session, test_user_id):
         """Test getting failed login statistics."""
         # Create various login events
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=None,
-            success=False,
-            failure_reason="user_not_found"
-        )
-        
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=str(test_user.id),
-            success=False,
-            failure_reason="invalid_password"
-        )
-        
-        await AuthEventService.log_event(
-            session=test_session,
-            event_type="login",
-            user_id=str(test_user.id),
-            success=True
-        )
+        await AuthEventService.log_events(test_session, [
+            {"event_type": "login", "user_id": None, "success": False,
+             "failure_reason": "user_not_found"},
+            {"event_type": "login", "user_id": test_user_id, "success": False,
+             "failure_reason": "invalid_password"},
+            {"event_type": "login", "user_id": test_user_id, "success": True},
+        ])
         
         stats = await AuthEventService.get_failed_login_stats(
             session=test_session,
@@ -544,7 +553,7 @@ class TestAuthEventService:
         assert "invalid_password" in reasons
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 class TestServiceErrorHandling:
     """Test error handling in services."""
     
@@ -571,13 +580,13 @@ class TestServiceErrorHandling:
                 expires_at=datetime.now(timezone.utc) + timedelta(days=7)
             )
     
-    async def test_auth_event_service_invalid_metadata(self, test_session, test_user):
+    async def test_auth_event_service_invalid_metadata(self, test_session, test_user_id):
         """Test AuthEventService with invalid metadata."""
         # Non-serializable metadata should still work (converted to string)
         event = await AuthEventService.log_event(
             session=test_session,
             event_type="test",
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             success=True,
             event_metadata={"complex": {"nested": "data"}}
         )
@@ -585,53 +594,72 @@ class TestServiceErrorHandling:
         assert event.event_metadata is not None
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.xdist_group("concurrency")
 class TestServiceConcurrency:
     """Test concurrent operations on services."""
     
-    async def test_concurrent_user_creation(self, test_session, user_data_factory):
-        """Test concurrent user creation."""
+    async def test_concurrent_user_creation(self, pooled_session_factory, user_data_factory):
+        """Test concurrent user creation with one session per task."""
         import asyncio
         
+        async def _create(user_data):
+            async with pooled_session_factory() as session:
+                return await UserService.create_user(session=session, **user_data)
+        
         # Create multiple users concurrently
-        tasks = []
-        for i in range(5):
-            user_data = user_data_factory(username=f"concurrent_user_{i}")
-            task = UserService.create_user(session=test_session, **user_data)
-            tasks.append(task)
+        suffix = uuid.uuid4().hex[:8]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(_create(user_data_factory(username=f"concurrent_user_{i}_{suffix}")))
+                for i in range(5)
+            ]
         
         # Should all succeed
-        users = await asyncio.gather(*tasks)
+        users = [task.result() for task in tasks]
         assert len(users) == 5
         assert all(user.username.startswith("concurrent_user_") for user in users)
     
-    async def test_concurrent_token_operations(self, test_session, test_user):
-        """Test concurrent token operations."""
+    async def test_concurrent_token_operations(self, pooled_session_factory, user_data_factory, uuid_gen):
+        """Test concurrent token operations with one session per task."""
         import asyncio
         
+        async with pooled_session_factory() as session:
+            owner = await UserService.create_user(session=session, **user_data_factory())
+        
+        async def _create(token_id):
+            async with pooled_session_factory() as session:
+                return await RefreshTokenService.create_refresh_token(
+                    session=session,
+                    user_id=str(owner.id),
+                    token_id=token_id,
+                    expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+                )
+        
+        async def _revoke(token_id):
+            async with pooled_session_factory() as session:
+                return await RefreshTokenService.revoke_refresh_token(
+                    session=session,
+                    token_id=token_id,
+                    reason="concurrent_test"
+                )
+        
         # Create tokens concurrently
-        create_tasks = []
-        for i in range(3):
-            task = RefreshTokenService.create_refresh_token(
-                session=test_session,
-                user_id=str(test_user.id),
-                token_id=f"concurrent_token_{i}",
-                expires_at=datetime.now(timezone.utc) + timedelta(days=7)
-            )
-            create_tasks.append(task)
+        async with asyncio.TaskGroup() as tg:
+            create_tasks = [
+                tg.create_task(_create(f"concurrent_token_{next(uuid_gen).hex}"))
+                for i in range(3)
+            ]
         
-        tokens = await asyncio.gather(*create_tasks)
+        tokens = [task.result() for task in create_tasks]
         assert len(tokens) == 3
         
         # Revoke tokens concurrently
-        revoke_tasks = [
-            RefreshTokenService.revoke_refresh_token(
-                session=test_session,
-                token_id=token.token_id,
-                reason="concurrent_test"
-            )
-            for token in tokens
-        ]
+        async with asyncio.TaskGroup() as tg:
+            revoke_tasks = [
+                tg.create_task(_revoke(token.token_id))
+                for token in tokens
+            ]
         
-        results = await asyncio.gather(*revoke_tasks)
+        results = [task.result() for task in revoke_tasks]
         assert all(results)  # All should succeed
\ No newline at end of file
@@ -2,12 +2,15 @@
 Simplified pytest configuration and fixtures for basic testing.
 """
 
+import copy
+import functools
+import logging
 import os
 import pytest
 import tempfile
-import shutil
-from typing import Generator, Dict, Any
-from unittest.mock import Mock, patch
+import uuid
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Generator, Dict, Any, Mapping
 
 # Set test environment variables before importing modules
 os.environ["TESTING"] = "1"
@@ -15,36 +18,61 @@ os.environ["GOOGLE_API_KEY"] = "test_google_key"
 os.environ["OPENAI_API_KEY"] = "test_openai_key"
 os.environ["OPENROUTER_API_KEY"] = "test_openrouter_key"
 
+if TYPE_CHECKING:
+    from src.grantha.core.config import Config
 
-@pytest.fixture
-def mock_env_vars() -> Generator[Dict[str, str], None, None]:
-    """Mock environment variables for testing."""
-    env_vars = {
-        "GOOGLE_API_KEY": "test_google_api_key",
-        "OPENAI_API_KEY": "test_openai_api_key",
-        "OPENROUTER_API_KEY": "test_openrouter_api_key",
-        "AWS_ACCESS_KEY_ID": "test_aws_access_key",
-        "AWS_SECRET_ACCESS_KEY": "test_aws_secret_key",
-        "AWS_REGION": "us-east-1",
-        "GRANTHA_AUTH_MODE": "False",
-        "GRANTHA_AUTH_CODE": "",
-    }
-    
-    with patch.dict(os.environ, env_vars, clear=False):
-        yield env_vars
+
+_MOCK_SETTINGS = MappingProxyType({
+    "google_api_key": "test_google_api_key",
+    "openai_api_key": "test_openai_api_key",
+    "openrouter_api_key": "test_openrouter_api_key",
+    "aws_access_key_id": "test_aws_access_key",
+    "aws_secret_access_key": "test_aws_secret_key",
+    "aws_region": "us-east-1",
+    "wiki_auth_mode": False,
+    "wiki_auth_code": "",
+})
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only view of nested dicts and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
 @pytest.fixture
-def temp_repo_dir() -> Generator[str, None, None]:
-    """Create a temporary directory for testing repository operations."""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def mock_env_vars() -> "Config":
+    """Test configuration passed explicitly instead of patching os.environ."""
+    # Imported here so sessions that never use it don't load the app package
+    from src.grantha.core.config import Config
+
+    return Config.for_testing(**_MOCK_SETTINGS)
+
+
+@pytest.fixture(scope="session")
+def _temp_root() -> Generator[str, None, None]:
+    """Session-wide parent for per-test temporary directories."""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as root:
+        yield root
 
 
 @pytest.fixture
-def sample_wiki_data():
-    """Sample wiki data for testing."""
+def temp_repo_dir(_temp_root: str) -> str:
+    """Create a fresh directory for testing repository operations.
+    
+    Directories live under one session root that is removed at session end.
+    """
+    temp_dir = os.path.join(_temp_root, uuid.uuid4().hex)
+    os.mkdir(temp_dir)
+    return temp_dir
+
+
+@functools.lru_cache(maxsize=1)
+def _build_sample_wiki_data() -> Dict[str, Any]:
+    """Build the sample wiki data once per process."""
     return {
         "wiki_structure": {
             "id": "test_wiki",
@@ -94,32 +122,34 @@ def sample_wiki_data():
     }
 
 
-@pytest.fixture(autouse=True)
-def setup_test_logging():
-    """Setup logging for tests."""
-    import logging
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("asyncio").setLevel(logging.WARNING)
+@pytest.fixture(scope="session")
+def sample_wiki_data() -> Mapping[str, Any]:
+    """Sample wiki data for testing (read-only, shared across the session)."""
+    return _freeze(_build_sample_wiki_data())
+
+
+@pytest.fixture
+def sample_wiki_data_mutable() -> Dict[str, Any]:
+    """Private copy of the sample wiki data for tests that mutate or serialize it."""
+    return copy.deepcopy(_build_sample_wiki_data())
 
 
 # Markers for different test types
+_MARKERS = (
+    "unit: Unit tests that don't require external dependencies",
+    "integration: Integration tests that test component interactions",
+    "e2e: End-to-end tests that test complete workflows",
+    "slow: Tests that take more than a few seconds to run",
+    "network: Tests that require network access",
+    "requires_api_key: Tests that require real API keys",
+    "llm: Tests that call a real LLM provider",
+)
+
+
 def pytest_configure(config):
-    """Configure custom pytest markers."""
-    config.addinivalue_line(
-        "markers", "unit: Unit tests that don't require external dependencies"
-    )
-    config.addinivalue_line(
-        "markers", "integration: Integration tests that test component interactions"
-    )
-    config.addinivalue_line(
-        "markers", "e2e: End-to-end tests that test complete workflows"
-    )
-    config.addinivalue_line(
-        "markers", "slow: Tests that take more than a few seconds to run"
-    )
-    config.addinivalue_line(
-        "markers", "network: Tests that require network access"
-    )
-    config.addinivalue_line(
-        "markers", "requires_api_key: Tests that require real API keys"
-    )
\ No newline at end of file
+    """Configure custom pytest markers and quiet noisy loggers once per process."""
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
+    
+    for marker in _MARKERS:
+        config.addinivalue_line("markers", marker)
\ No newline at end of file
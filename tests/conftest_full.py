@@ -2,36 +2,138 @@
 pytest configuration and fixtures for Grantha test suite.
 """
 
+from __future__ import annotations
+
+import logging
 import os
 import pytest
-import asyncio
 import tempfile
-import shutil
-from typing import Generator, Dict, Any
-from unittest.mock import Mock, patch
+import uuid
+from types import MappingProxyType, SimpleNamespace
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, Mock, patch
 from fastapi.testclient import TestClient
 
+if TYPE_CHECKING:
+    from typing import Any, Dict, Generator, Mapping
+
 # Set test environment variables before importing modules
 os.environ["TESTING"] = "1"
 os.environ["GOOGLE_API_KEY"] = "test_google_key"
 os.environ["OPENAI_API_KEY"] = "test_openai_key"
 os.environ["OPENROUTER_API_KEY"] = "test_openrouter_key"
 
-from api.api import app
-from api.config import configs
+# Canned provider responses, built once and shared by the mock fixtures;
+# treat them as read-only
+_GEMINI_RESPONSE = SimpleNamespace(
+    text="Test response from Gemini",
+    parts=[SimpleNamespace(text="Test response from Gemini")]
+)
+_OPENAI_RESPONSE = SimpleNamespace(
+    choices=[SimpleNamespace(message=SimpleNamespace(content="Test response from OpenAI"))]
+)
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def _freeze(value: Any) -> Any:
+    """Return a read-only view of nested dicts and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a value built by ``_freeze``."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+# Sample data shared by every test that requests it; mutation raises TypeError
+_SAMPLE_WIKI_DATA = _freeze({
+    "wiki_structure": {
+        "id": "test_wiki",
+        "title": "Test Wiki",
+        "description": "A test wiki for unit testing",
+        "pages": [
+            {
+                "id": "page1",
+                "title": "Page 1",
+                "content": "Content of page 1",
+                "filePaths": ["file1.py"],
+                "importance": "high",
+                "relatedPages": ["page2"]
+            },
+            {
+                "id": "page2", 
+                "title": "Page 2",
+                "content": "Content of page 2",
+                "filePaths": ["file2.py"],
+                "importance": "medium",
+                "relatedPages": ["page1"]
+            }
+        ],
+        "sections": [],
+        "rootSections": []
+    },
+    "generated_pages": {
+        "page1": {
+            "id": "page1",
+            "title": "Page 1", 
+            "content": "Content of page 1",
+            "filePaths": ["file1.py"],
+            "importance": "high",
+            "relatedPages": ["page2"]
+        }
+    },
+    "repo": {
+        "owner": "testuser",
+        "repo": "testrepo", 
+        "type": "github",
+        "token": None,
+        "localPath": None,
+        "repoUrl": "https://github.com/testuser/testrepo"
+    },
+    "provider": "google",
+    "model": "gemini-2.5-flash"
+})
+
+_SAMPLE_REPO_STRUCTURE = _freeze({
+    "name": "test-repo",
+    "description": "A test repository",
+    "files": [
+        {
+            "path": "main.py",
+            "content": "print('Hello, World!')",
+            "language": "python"
+        },
+        {
+            "path": "README.md",
+            "content": "# Test Repository\n\nThis is a test.",
+            "language": "markdown"
+        },
+        {
+            "path": "requirements.txt",
+            "content": "fastapi>=0.95.0\npydantic>=2.0.0",
+            "language": "text"
+        }
+    ],
+    "structure": {
+        "directories": ["tests", "src"],
+        "files": ["main.py", "README.md", "requirements.txt"]
+    }
+})
 
 
 @pytest.fixture(scope="session")
 def test_client():
     """Create a test client for the FastAPI app."""
+    # Imported here so tests that never use the client skip loading the app
+    from api.api import app
+    
     with TestClient(app) as client:
         yield client
 
@@ -54,180 +156,123 @@ def mock_env_vars() -> Generator[Dict[str, str], None, None]:
         yield env_vars
 
 
+@pytest.fixture(scope="session")
+def temp_repo_dir_session() -> Generator[str, None, None]:
+    """Session-wide parent for per-test temporary directories."""
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as root:
+        yield root
+
+
 @pytest.fixture
-def temp_repo_dir() -> Generator[str, None, None]:
-    """Create a temporary directory for testing repository operations."""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def temp_repo_dir(temp_repo_dir_session: str) -> str:
+    """Create a fresh directory for testing repository operations."""
+    temp_dir = os.path.join(temp_repo_dir_session, uuid.uuid4().hex)
+    os.mkdir(temp_dir)
+    return temp_dir
 
 
 @pytest.fixture
 def mock_google_genai():
     """Mock Google Generative AI for testing."""
-    with patch('google.generativeai.configure') as mock_configure, \
-         patch('google.generativeai.GenerativeModel') as mock_model:
-        
-        mock_response = Mock()
-        mock_response.text = "Test response from Gemini"
-        mock_response.parts = [Mock(text="Test response from Gemini")]
-        
-        mock_model_instance = Mock()
-        mock_model_instance.generate_content.return_value = mock_response
-        mock_model.return_value = mock_model_instance
-        
+    import google.generativeai as genai
+    
+    mock_model_instance = Mock()
+    mock_model_instance.generate_content.return_value = _GEMINI_RESPONSE
+    mock_configure = MagicMock()
+    mock_model = MagicMock(return_value=mock_model_instance)
+    
+    # Plain attribute swaps are much cheaper than patch() start/stop
+    original_configure, original_model = genai.configure, genai.GenerativeModel
+    genai.configure, genai.GenerativeModel = mock_configure, mock_model
+    try:
         yield {
             'configure': mock_configure,
             'model': mock_model,
-            'response': mock_response
+            'response': _GEMINI_RESPONSE
         }
+    finally:
+        genai.configure, genai.GenerativeModel = original_configure, original_model
 
 
 @pytest.fixture
 def mock_openai_client():
     """Mock OpenAI client for testing."""
-    with patch('openai.OpenAI') as mock_client:
-        mock_response = Mock()
-        mock_response.choices = [Mock(message=Mock(content="Test response from OpenAI"))]
-        
-        mock_client_instance = Mock()
-        mock_client_instance.chat.completions.create.return_value = mock_response
-        mock_client.return_value = mock_client_instance
-        
+    import openai
+    
+    mock_client_instance = Mock()
+    mock_client_instance.chat.completions.create.return_value = _OPENAI_RESPONSE
+    mock_client = MagicMock(return_value=mock_client_instance)
+    
+    original_client = openai.OpenAI
+    openai.OpenAI = mock_client
+    try:
         yield mock_client
+    finally:
+        openai.OpenAI = original_client
+
+
+@pytest.fixture(scope="session")
+def sample_wiki_data() -> Mapping[str, Any]:
+    """Sample wiki data for testing (read-only, shared across the session)."""
+    return _SAMPLE_WIKI_DATA
 
 
 @pytest.fixture
-def sample_wiki_data():
-    """Sample wiki data for testing."""
-    return {
-        "wiki_structure": {
-            "id": "test_wiki",
-            "title": "Test Wiki",
-            "description": "A test wiki for unit testing",
-            "pages": [
-                {
-                    "id": "page1",
-                    "title": "Page 1",
-                    "content": "Content of page 1",
-                    "filePaths": ["file1.py"],
-                    "importance": "high",
-                    "relatedPages": ["page2"]
-                },
-                {
-                    "id": "page2", 
-                    "title": "Page 2",
-                    "content": "Content of page 2",
-                    "filePaths": ["file2.py"],
-                    "importance": "medium",
-                    "relatedPages": ["page1"]
-                }
-            ],
-            "sections": [],
-            "rootSections": []
-        },
-        "generated_pages": {
-            "page1": {
-                "id": "page1",
-                "title": "Page 1", 
-                "content": "Content of page 1",
-                "filePaths": ["file1.py"],
-                "importance": "high",
-                "relatedPages": ["page2"]
-            }
-        },
-        "repo": {
-            "owner": "testuser",
-            "repo": "testrepo", 
-            "type": "github",
-            "token": None,
-            "localPath": None,
-            "repoUrl": "https://github.com/testuser/testrepo"
-        },
-        "provider": "google",
-        "model": "gemini-2.5-flash"
-    }
+def sample_wiki_data_mutable() -> Dict[str, Any]:
+    """Private copy of the sample wiki data for tests that mutate or serialize it."""
+    return _thaw(_SAMPLE_WIKI_DATA)
 
 
 @pytest.fixture
 def mock_file_system():
     """Mock file system operations for testing."""
-    with patch('os.path.exists') as mock_exists, \
-         patch('os.listdir') as mock_listdir, \
-         patch('os.walk') as mock_walk, \
-         patch('builtins.open', create=True) as mock_open:
-        
-        mock_exists.return_value = True
-        mock_listdir.return_value = ['test_file.py', 'test_file2.py']
-        mock_walk.return_value = [
-            ('/test/path', ['subdir'], ['file1.py', 'file2.py']),
-            ('/test/path/subdir', [], ['file3.py'])
-        ]
-        
+    import builtins
+    
+    mock_exists = MagicMock(return_value=True)
+    mock_listdir = MagicMock(return_value=['test_file.py', 'test_file2.py'])
+    mock_walk = MagicMock(return_value=[
+        ('/test/path', ['subdir'], ['file1.py', 'file2.py']),
+        ('/test/path/subdir', [], ['file3.py'])
+    ])
+    mock_open = MagicMock()
+    
+    originals = (os.path.exists, os.listdir, os.walk, builtins.open)
+    os.path.exists, os.listdir, os.walk, builtins.open = (
+        mock_exists, mock_listdir, mock_walk, mock_open
+    )
+    try:
         yield {
             'exists': mock_exists,
             'listdir': mock_listdir,
             'walk': mock_walk,
             'open': mock_open
         }
+    finally:
+        os.path.exists, os.listdir, os.walk, builtins.open = originals
 
 
-@pytest.fixture
-def sample_repo_structure():
-    """Sample repository structure for testing."""
-    return {
-        "name": "test-repo",
-        "description": "A test repository",
-        "files": [
-            {
-                "path": "main.py",
-                "content": "print('Hello, World!')",
-                "language": "python"
-            },
-            {
-                "path": "README.md",
-                "content": "# Test Repository\n\nThis is a test.",
-                "language": "markdown"
-            },
-            {
-                "path": "requirements.txt",
-                "content": "fastapi>=0.95.0\npydantic>=2.0.0",
-                "language": "text"
-            }
-        ],
-        "structure": {
-            "directories": ["tests", "src"],
-            "files": ["main.py", "README.md", "requirements.txt"]
-        }
-    }
+@pytest.fixture(scope="session")
+def sample_repo_structure() -> Mapping[str, Any]:
+    """Sample repository structure for testing (read-only)."""
+    return _SAMPLE_REPO_STRUCTURE
 
 
-@pytest.fixture(autouse=True)
-def setup_test_logging():
-    """Setup logging for tests."""
-    import logging
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("asyncio").setLevel(logging.WARNING)
+# Markers for different test types
+_MARKERS = (
+    "unit: Unit tests that don't require external dependencies",
+    "integration: Integration tests that test component interactions",
+    "e2e: End-to-end tests that test complete workflows",
+    "slow: Tests that take more than a few seconds to run",
+    "network: Tests that require network access",
+    "requires_api_key: Tests that require real API keys",
+    "llm: Tests that call a real LLM provider",
+)
 
 
-# Markers for different test types
 def pytest_configure(config):
-    """Configure custom pytest markers."""
-    config.addinivalue_line(
-        "markers", "unit: Unit tests that don't require external dependencies"
-    )
-    config.addinivalue_line(
-        "markers", "integration: Integration tests that test component interactions"
-    )
-    config.addinivalue_line(
-        "markers", "e2e: End-to-end tests that test complete workflows"
-    )
-    config.addinivalue_line(
-        "markers", "slow: Tests that take more than a few seconds to run"
-    )
-    config.addinivalue_line(
-        "markers", "network: Tests that require network access"
-    )
-    config.addinivalue_line(
-        "markers", "requires_api_key: Tests that require real API keys"
-    )
\ No newline at end of file
+    """Configure custom pytest markers and quiet noisy loggers once per process."""
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
+    
+    for marker in _MARKERS:
+        config.addinivalue_line("markers", marker)
\ No newline at end of file
@@ -2,31 +2,21 @@
 End-to-end tests for complete wiki generation workflow.
 """
 
+import asyncio
+import copy
 import pytest
 import tempfile
-import shutil
-import json
-import os
+import httpx
+import orjson
+from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, Mock
 from fastapi.testclient import TestClient
 
-from api.api import app
 
-
-@pytest.fixture
-def e2e_client():
-    """Create test client for E2E testing."""
-    return TestClient(app)
-
-
-@pytest.fixture
-def mock_repository():
-    """Create a mock repository structure for testing."""
-    temp_dir = tempfile.mkdtemp()
-    
-    # Create sample files
-    files = {
-        "main.py": """
+# Read-only content of the mock repository, written once per session
+_MOCK_REPOSITORY_FILES = {
+    "main.py": """
 def main():
     '''Main application entry point.'''
     print("Hello, Grantha!")
@@ -35,7 +25,7 @@ def main():
 if __name__ == "__main__":
     main()
 """,
-        "api.py": """
+    "api.py": """
 from fastapi import FastAPI
 
 app = FastAPI(title="Test API")
@@ -48,7 +38,7 @@ async def root():
 async def health():
     return {"status": "healthy"}
 """,
-        "utils.py": """
+    "utils.py": """
 def helper_function(data):
     '''Utility function for data processing.'''
     return data.upper()
@@ -60,7 +50,7 @@ class DataProcessor:
     def process(self, item):
         return helper_function(item)
 """,
-        "README.md": """
+    "README.md": """
 # Test Repository
 
 This is a test repository for Grantha wiki generation.
@@ -81,271 +71,314 @@ from main import main
 main()
 ```
 """,
-        "requirements.txt": """
+    "requirements.txt": """
 fastapi>=0.95.0
 uvicorn>=0.21.1
 pydantic>=2.0.0
 pytest>=7.0.0
 """,
-        "config.json": """
+    "config.json": """
 {
     "app_name": "Test Application",
     "debug": true,
     "database_url": "sqlite:///test.db"
 }
 """
-    }
-    
-    for filename, content in files.items():
-        with open(os.path.join(temp_dir, filename), 'w') as f:
-            f.write(content)
-    
-    yield temp_dir
-    
-    # Cleanup
-    shutil.rmtree(temp_dir)
+}
 
 
-@pytest.mark.e2e
-@pytest.mark.slow
-class TestWikiGenerationWorkflow:
-    """End-to-end test suite for wiki generation workflow."""
+# Wiki structure returned by the mocked generator in the complete flow test;
+# tests take a deepcopy so nested pages can't leak changes between tests
+_MOCK_WIKI_STRUCTURE = {
+    "id": "example_repo_wiki",
+    "title": "Example Repository Wiki",
+    "description": "Auto-generated documentation for example repository",
+    "pages": [
+        {
+            "id": "overview",
+            "title": "Project Overview", 
+            "content": "# Project Overview\n\nThis repository contains a FastAPI application with utilities.",
+            "filePaths": ["README.md"],
+            "importance": "high",
+            "relatedPages": ["api_reference", "utilities"]
+        },
+        {
+            "id": "api_reference",
+            "title": "API Reference",
+            "content": "# API Reference\n\n## Endpoints\n\n### GET /\nReturns welcome message.",
+            "filePaths": ["api.py"],
+            "importance": "high", 
+            "relatedPages": ["overview"]
+        },
+        {
+            "id": "utilities",
+            "title": "Utility Functions",
+            "content": "# Utility Functions\n\n## DataProcessor\nClass for processing data.",
+            "filePaths": ["utils.py"],
+            "importance": "medium",
+            "relatedPages": ["overview"]
+        }
+    ],
+    "sections": [
+        {
+            "id": "core",
+            "title": "Core Components",
+            "pages": ["overview", "api_reference"],
+            "subsections": []
+        },
+        {
+            "id": "helpers", 
+            "title": "Helper Modules",
+            "pages": ["utilities"],
+            "subsections": []
+        }
+    ],
+    "rootSections": ["core", "helpers"]
+}
+
+
+# Request bodies that never change, serialized once at import
+_JSON_HEADERS = {"content-type": "application/json"}
+
+_GENERATION_REQUEST = orjson.dumps({
+    "repo_url": "https://github.com/test/example-repo",
+    "language": "en",
+    "provider": "google",
+    "model": "gemini-2.5-flash",
+    "repo_type": "github"
+})
+
+_RESEARCH_REQUEST = orjson.dumps({
+    "query": "How is this FastAPI application structured and what are the main components?",
+    "repo_url": "https://github.com/test/example-repo",
+    "language": "en",
+    "provider": "google",
+    "repo_type": "github"
+})
+
+_INVALID_URL_REQUEST = orjson.dumps({
+    "repo_url": "invalid-url",
+    "language": "en",
+    "provider": "google",
+    "repo_type": "github"
+})
+
+_INVALID_PROVIDER_REQUEST = orjson.dumps({
+    "repo_url": "https://github.com/test/repo",
+    "language": "en",
+    "provider": "invalid_provider",
+    "repo_type": "github"
+})
+
+_UNSUPPORTED_LANG_REQUEST = orjson.dumps({
+    "repo_url": "https://github.com/test/repo",
+    "language": "unsupported_lang",
+    "provider": "google",
+    "repo_type": "github"
+})
+
+
+@pytest.fixture(scope="session")
+def test_client():
+    """Create one E2E test client for the session so the app starts up once."""
+    # Imported here so collecting this module doesn't load the app
+    from api.api import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def mock_repository():
+    """Create a mock repository structure shared by the whole session.
     
-    def test_complete_wiki_generation_flow(self, e2e_client, mock_repository):
-        """Test complete wiki generation from repository to export."""
-        repo_url = "https://github.com/test/example-repo"
+    Tests must treat it as read-only.
+    """
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+        root = Path(temp_dir)
         
-        with patch('api.api.download_repo') as mock_download, \
-             patch('api.api.WikiGenerator') as mock_wiki_gen:
-            
-            # Mock repository download
-            mock_download.return_value = mock_repository
-            
-            # Mock wiki generator
-            mock_generator = Mock()
-            mock_wiki_structure = {
-                "id": "example_repo_wiki",
-                "title": "Example Repository Wiki",
-                "description": "Auto-generated documentation for example repository",
-                "pages": [
-                    {
-                        "id": "overview",
-                        "title": "Project Overview", 
-                        "content": "# Project Overview\n\nThis repository contains a FastAPI application with utilities.",
-                        "filePaths": ["README.md"],
-                        "importance": "high",
-                        "relatedPages": ["api_reference", "utilities"]
-                    },
-                    {
-                        "id": "api_reference",
-                        "title": "API Reference",
-                        "content": "# API Reference\n\n## Endpoints\n\n### GET /\nReturns welcome message.",
-                        "filePaths": ["api.py"],
-                        "importance": "high", 
-                        "relatedPages": ["overview"]
-                    },
-                    {
-                        "id": "utilities",
-                        "title": "Utility Functions",
-                        "content": "# Utility Functions\n\n## DataProcessor\nClass for processing data.",
-                        "filePaths": ["utils.py"],
-                        "importance": "medium",
-                        "relatedPages": ["overview"]
-                    }
-                ],
-                "sections": [
-                    {
-                        "id": "core",
-                        "title": "Core Components",
-                        "pages": ["overview", "api_reference"],
-                        "subsections": []
-                    },
-                    {
-                        "id": "helpers", 
-                        "title": "Helper Modules",
-                        "pages": ["utilities"],
-                        "subsections": []
-                    }
-                ],
-                "rootSections": ["core", "helpers"]
-            }
-            
-            mock_generator.generate_wiki_structure.return_value = mock_wiki_structure
-            mock_wiki_gen.return_value = mock_generator
-            
-            # Step 1: Generate wiki structure
-            generation_request = {
-                "repo_url": repo_url,
-                "language": "en",
-                "provider": "google",
-                "model": "gemini-2.5-flash",
-                "repo_type": "github"
-            }
-            
-            response = e2e_client.post("/api/wiki/generate", json=generation_request)
-            assert response.status_code == 200
-            
-            wiki_data = response.json()
-            assert "title" in wiki_data
-            assert "pages" in wiki_data
-            assert len(wiki_data["pages"]) > 0
-            
-            # Step 2: Store generated wiki in cache
-            cache_data = {
-                "repo": {
-                    "owner": "test",
-                    "repo": "example-repo",
-                    "type": "github",
-                    "repoUrl": repo_url
-                },
-                "language": "en",
-                "wiki_structure": wiki_data,
-                "generated_pages": {page["id"]: page for page in wiki_data["pages"]},
-                "provider": "google",
-                "model": "gemini-2.5-flash"
-            }
-            
-            with patch('api.api.save_wiki_cache') as mock_save:
-                mock_save.return_value = True
-                
-                response = e2e_client.post("/api/wiki_cache", json=cache_data)
-                assert response.status_code == 200
-                assert "successfully" in response.json()["message"]
-            
-            # Step 3: Retrieve cached wiki
-            with patch('api.api.read_wiki_cache') as mock_read:
-                mock_read.return_value = Mock(**cache_data)
-                
-                response = e2e_client.get(
-                    "/api/wiki_cache",
-                    params={
-                        "owner": "test",
-                        "repo": "example-repo", 
-                        "repo_type": "github",
-                        "language": "en"
-                    }
-                )
-                assert response.status_code == 200
-                cached_data = response.json()
-                assert cached_data is not None
-            
-            # Step 4: Export wiki as Markdown
-            export_request = {
-                "repo_url": repo_url,
-                "format": "markdown",
-                "pages": wiki_data["pages"]
-            }
-            
-            response = e2e_client.post("/export/wiki", json=export_request)
-            assert response.status_code == 200
-            assert "text/markdown" in response.headers["content-type"]
-            assert "attachment" in response.headers["content-disposition"]
-            
-            # Verify exported content contains expected elements
-            content = response.content.decode('utf-8')
-            assert "# Wiki Documentation for" in content
-            assert "Table of Contents" in content
-            assert "Project Overview" in content
-            
-            # Step 5: Export wiki as JSON
-            export_request["format"] = "json"
-            
-            response = e2e_client.post("/export/wiki", json=export_request)
-            assert response.status_code == 200
-            assert "application/json" in response.headers["content-type"]
-            
-            # Verify JSON structure
-            json_content = json.loads(response.content.decode('utf-8'))
-            assert "metadata" in json_content
-            assert "pages" in json_content
-            assert len(json_content["pages"]) > 0
+        for filename, content in _MOCK_REPOSITORY_FILES.items():
+            (root / filename).write_text(content)
+        
+        yield temp_dir
 
-    def test_mermaid_diagram_generation_flow(self, e2e_client, mock_repository):
-        """Test Mermaid diagram generation workflow."""
-        repo_url = "https://github.com/test/example-repo"
+
+@pytest.fixture
+def mermaid_wiki_generator(mock_repository):
+    """Patch repository download and WikiGenerator with canned Mermaid diagrams."""
+    with patch('api.api.download_repo') as mock_download, \
+         patch('api.api.WikiGenerator') as mock_wiki_gen:
         
-        with patch('api.api.download_repo') as mock_download, \
-             patch('api.api.WikiGenerator') as mock_wiki_gen:
-            
-            mock_download.return_value = mock_repository
-            
-            # Mock wiki generator and diagram generation
-            mock_generator = Mock()
-            mock_repo_structure = {
-                "files": ["main.py", "api.py", "utils.py"],
-                "structure": {
-                    "python_files": ["main.py", "api.py", "utils.py"],
-                    "web_framework": ["api.py"]
-                }
+        mock_download.return_value = mock_repository
+        
+        # Mock wiki generator and diagram generation
+        mock_generator = Mock()
+        mock_repo_structure = {
+            "files": ["main.py", "api.py", "utils.py"],
+            "structure": {
+                "python_files": ["main.py", "api.py", "utils.py"],
+                "web_framework": ["api.py"]
             }
-            mock_generator._analyze_repository.return_value = mock_repo_structure
-            
-            # Mock different diagram types
-            mock_generator._generate_architecture_diagram.return_value = """
+        }
+        mock_generator._analyze_repository.return_value = mock_repo_structure
+        
+        # Mock different diagram types
+        mock_generator._generate_architecture_diagram.return_value = """
 graph TD
     A[main.py] --> B[api.py]
     A --> C[utils.py]
     B --> D[FastAPI App]
     C --> E[Data Processing]
 """
-            
-            mock_generator._generate_data_flow_diagram.return_value = """
+        
+        mock_generator._generate_data_flow_diagram.return_value = """
 flowchart LR
     Input --> Process[Data Processing]
     Process --> Output
     Process --> Store[Database]
 """
-            
-            mock_generator._generate_api_flow_diagram.return_value = """
+        
+        mock_generator._generate_api_flow_diagram.return_value = """
 sequenceDiagram
     Client->>+API: GET /
     API-->>-Client: Hello World
     Client->>+API: GET /health
     API-->>-Client: Status
 """
-            
-            mock_wiki_gen.return_value = mock_generator
-            
-            # Test architecture diagram
-            response = e2e_client.get(
-                "/api/wiki/mermaid",
-                params={
-                    "repo_url": repo_url,
-                    "diagram_type": "architecture"
-                }
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["diagram_type"] == "architecture"
-            assert "graph TD" in data["mermaid"]
-            
-            # Test data flow diagram
-            response = e2e_client.get(
-                "/api/wiki/mermaid",
-                params={
-                    "repo_url": repo_url,
-                    "diagram_type": "data-flow"
-                }
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["diagram_type"] == "data-flow"
-            assert "flowchart" in data["mermaid"]
-            
-            # Test API flow diagram
-            response = e2e_client.get(
-                "/api/wiki/mermaid", 
-                params={
-                    "repo_url": repo_url,
-                    "diagram_type": "api-flow"
-                }
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["diagram_type"] == "api-flow"
-            assert "sequenceDiagram" in data["mermaid"]
+        
+        mock_wiki_gen.return_value = mock_generator
+        
+        yield mock_generator
 
-    def test_deep_research_workflow(self, e2e_client, mock_repository):
+
+@pytest.mark.e2e
+@pytest.mark.slow
+class TestWikiGenerationWorkflow:
+    """End-to-end test suite for wiki generation workflow."""
+    
+    def test_complete_wiki_generation_flow(self, test_client, mock_repository, monkeypatch):
+        """Test complete wiki generation from repository to export."""
+        repo_url = "https://github.com/test/example-repo"
+        
+        # Mock repository download
+        mock_download = Mock(return_value=mock_repository)
+        monkeypatch.setattr('api.api.download_repo', mock_download)
+        
+        # Mock wiki generator
+        mock_generator = Mock()
+        wiki_structure = copy.deepcopy(_MOCK_WIKI_STRUCTURE)
+        mock_generator.generate_wiki_structure.return_value = wiki_structure
+        monkeypatch.setattr('api.api.WikiGenerator', Mock(return_value=mock_generator))
+        
+        # Step 1: Generate wiki structure
+        response = test_client.post(
+            "/api/wiki/generate", content=_GENERATION_REQUEST, headers=_JSON_HEADERS
+        )
+        assert response.status_code == 200
+        
+        wiki_data = response.json()
+        assert "title" in wiki_data
+        assert "pages" in wiki_data
+        assert len(wiki_data["pages"]) > 0
+        
+        # Step 2: Store generated wiki in cache
+        cache_data = {
+            "repo": {
+                "owner": "test",
+                "repo": "example-repo",
+                "type": "github",
+                "repoUrl": repo_url
+            },
+            "language": "en",
+            "wiki_structure": wiki_data,
+            "generated_pages": {page["id"]: page for page in wiki_structure["pages"]},
+            "provider": "google",
+            "model": "gemini-2.5-flash"
+        }
+        
+        monkeypatch.setattr('api.api.save_wiki_cache', Mock(return_value=True))
+        
+        response = test_client.post(
+            "/api/wiki_cache", content=orjson.dumps(cache_data), headers=_JSON_HEADERS
+        )
+        assert response.status_code == 200
+        assert "successfully" in response.json()["message"]
+        
+        # Step 3: Retrieve cached wiki
+        monkeypatch.setattr('api.api.read_wiki_cache', Mock(return_value=SimpleNamespace(**cache_data)))
+        
+        response = test_client.get(
+            "/api/wiki_cache",
+            params={
+                "owner": "test",
+                "repo": "example-repo", 
+                "repo_type": "github",
+                "language": "en"
+            }
+        )
+        assert response.status_code == 200
+        cached_data = response.json()
+        assert cached_data is not None
+        
+        # Step 4: Export wiki as Markdown
+        export_request = {
+            "repo_url": repo_url,
+            "format": "markdown",
+            "pages": wiki_data["pages"]
+        }
+        
+        response = test_client.post(
+            "/export/wiki", content=orjson.dumps(export_request), headers=_JSON_HEADERS
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert response.headers["content-disposition"].startswith("attachment")
+        
+        # Verify exported content contains expected elements
+        content = response.content.decode('utf-8')
+        assert "# Wiki Documentation for" in content
+        assert "Table of Contents" in content
+        assert "Project Overview" in content
+        
+        # Step 5: Export wiki as JSON
+        export_request["format"] = "json"
+        
+        response = test_client.post(
+            "/export/wiki", content=orjson.dumps(export_request), headers=_JSON_HEADERS
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        
+        # Verify JSON structure
+        json_content = orjson.loads(response.content)
+        assert "metadata" in json_content
+        assert "pages" in json_content
+        assert len(json_content["pages"]) > 0
+
+    @pytest.mark.parametrize("diagram_type,expected_token", [
+        ("architecture", "graph TD"),
+        ("data-flow", "flowchart"),
+        ("api-flow", "sequenceDiagram"),
+    ])
+    def test_mermaid_diagram_generation_flow(
+        self, test_client, mermaid_wiki_generator, diagram_type, expected_token
+    ):
+        """Test Mermaid diagram generation workflow."""
+        repo_url = "https://github.com/test/example-repo"
+        
+        response = test_client.get(
+            "/api/wiki/mermaid",
+            params={
+                "repo_url": repo_url,
+                "diagram_type": diagram_type
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["diagram_type"] == diagram_type
+        assert expected_token in data["mermaid"]
+
+    def test_deep_research_workflow(self, test_client, mock_repository):
         """Test deep research workflow."""
         with patch('api.api.DeepResearch') as mock_deep_research:
             
@@ -397,76 +430,56 @@ sequenceDiagram
             mock_deep_research.return_value = mock_researcher
             
             # Test deep research request
-            research_request = {
-                "query": "How is this FastAPI application structured and what are the main components?",
-                "repo_url": "https://github.com/test/example-repo",
-                "language": "en",
-                "provider": "google",
-                "repo_type": "github"
-            }
-            
-            response = e2e_client.post("/api/research/deep", json=research_request)
-            assert response.status_code == 200
-            assert "application/x-ndjson" in response.headers["content-type"]
-            
-            # Verify streaming response format
-            content = response.content.decode('utf-8')
-            lines = [line for line in content.split('\n') if line.strip()]
-            assert len(lines) > 0
-            
-            # Each line should be valid JSON
-            for line in lines:
-                data = json.loads(line)
-                assert "stage" in data
-                assert "content" in data
-                assert "timestamp" in data
-
-    def test_error_handling_workflow(self, e2e_client):
+            with test_client.stream(
+                "POST", "/api/research/deep", content=_RESEARCH_REQUEST, headers=_JSON_HEADERS
+            ) as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("application/x-ndjson")
+                
+                # Verify streaming response format; each line should be valid JSON
+                line_count = 0
+                for line in response.iter_lines():
+                    if not line.strip():
+                        continue
+                    data = orjson.loads(line)
+                    assert "stage" in data
+                    assert "content" in data
+                    assert "timestamp" in data
+                    line_count += 1
+                
+                assert line_count > 0
+
+    def test_error_handling_workflow(self, test_client):
         """Test error handling throughout the workflow."""
         # Test with invalid repository URL
-        invalid_request = {
-            "repo_url": "invalid-url",
-            "language": "en",
-            "provider": "google",
-            "repo_type": "github"
-        }
-        
         with patch('api.api.download_repo') as mock_download:
             mock_download.side_effect = Exception("Repository not found")
             
-            response = e2e_client.post("/api/wiki/generate", json=invalid_request)
+            response = test_client.post(
+                "/api/wiki/generate", content=_INVALID_URL_REQUEST, headers=_JSON_HEADERS
+            )
             assert response.status_code == 500
             assert "Failed to generate wiki structure" in response.json()["detail"]
         
         # Test with invalid provider
-        invalid_provider_request = {
-            "repo_url": "https://github.com/test/repo",
-            "language": "en", 
-            "provider": "invalid_provider",
-            "repo_type": "github"
-        }
-        
-        response = e2e_client.post("/api/wiki/generate", json=invalid_provider_request)
+        response = test_client.post(
+            "/api/wiki/generate", content=_INVALID_PROVIDER_REQUEST, headers=_JSON_HEADERS
+        )
         # Should either handle gracefully or return appropriate error
         assert response.status_code in [422, 500]
         
         # Test with unsupported language
-        unsupported_lang_request = {
-            "repo_url": "https://github.com/test/repo",
-            "language": "unsupported_lang",
-            "provider": "google",
-            "repo_type": "github"
-        }
-        
-        response = e2e_client.post("/api/wiki/generate", json=unsupported_lang_request)
+        response = test_client.post(
+            "/api/wiki/generate", content=_UNSUPPORTED_LANG_REQUEST, headers=_JSON_HEADERS
+        )
         # Should fallback to default language or handle appropriately
         assert response.status_code in [200, 422]
 
     @pytest.mark.network
-    def test_local_repository_workflow(self, e2e_client, mock_repository):
+    def test_local_repository_workflow(self, test_client, mock_repository):
         """Test workflow with local repository."""
         # Test local repository structure endpoint
-        response = e2e_client.get(f"/local_repo/structure?path={mock_repository}")
+        response = test_client.get(f"/local_repo/structure?path={mock_repository}")
         assert response.status_code == 200
         
         data = response.json()
@@ -483,28 +496,39 @@ sequenceDiagram
         readme_content = data["readme"]
         assert "Test Repository" in readme_content or readme_content == ""
 
-    def test_configuration_endpoints_workflow(self, e2e_client):
+    @pytest.mark.asyncio
+    async def test_configuration_endpoints_workflow(self):
         """Test configuration-related endpoints workflow."""
+        from api.api import app
+        
+        # The three endpoints are independent, so fetch them concurrently.
+        # ASGITransport doesn't drive lifespan events, so run them explicitly
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app), \
+                httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            config_response, lang_response, auth_response = await asyncio.gather(
+                client.get("/models/config"),
+                client.get("/lang/config"),
+                client.get("/auth/status"),
+            )
+        
         # Test model configuration
-        response = e2e_client.get("/models/config")
-        assert response.status_code == 200
+        assert config_response.status_code == 200
         
-        config = response.json()
+        config = config_response.json()
         assert "providers" in config
         assert "defaultProvider" in config
         
         # Test language configuration
-        response = e2e_client.get("/lang/config")
-        assert response.status_code == 200
+        assert lang_response.status_code == 200
         
-        lang_config = response.json()
+        lang_config = lang_response.json()
         assert "supported_languages" in lang_config
         assert "default" in lang_config
         assert "en" in lang_config["supported_languages"]
         
         # Test authentication status
-        response = e2e_client.get("/auth/status")
-        assert response.status_code == 200
+        assert auth_response.status_code == 200
         
-        auth_status = response.json()
+        auth_status = auth_response.json()
         assert "auth_required" in auth_status
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Shared fixtures for the API integration tests.
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+import requests
+from requests.adapters import HTTPAdapter
+from unittest.mock import Mock
+from urllib3.util.retry import Retry
+
+# Live server the network-bound integration tests talk to
+LIVE_API_URL = "http://localhost:8000"
+
+# A WikiGenerator instance with every method the endpoint tests touch
+# pre-wired; built once and reset per test by the wiki_generator_mock fixture
+_WIKI_GENERATOR = Mock(spec=[
+    "generate_wiki_structure",
+    "_analyze_repository",
+    "_generate_architecture_diagram",
+])
+_WIKI_GENERATOR.generate_wiki_structure.return_value = {"title": "Test Wiki", "pages": []}
+_WIKI_GENERATOR._analyze_repository.return_value = {"files": []}
+_WIKI_GENERATOR._generate_architecture_diagram.return_value = "graph TD\n    A --> B"
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Load the API application once per session (per xdist worker)."""
+    # Imported here so the websocket and workflow tests in this directory
+    # don't pay for (or fail on) loading the legacy app
+    from api.api import app
+
+    return app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(app):
+    """Create one ASGI client for the session so the app starts up once."""
+    # ASGITransport doesn't drive lifespan events, so run them explicitly
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def live_client():
+    """Keep-alive async client for the live API server, shared by the whole session."""
+    # HTTP/1.1 on purpose: the API runs under uvicorn, which doesn't speak
+    # HTTP/2, so http2=True would only add the h2 dependency
+    timeout = httpx.Timeout(30, connect=3)
+    async with httpx.AsyncClient(base_url=LIVE_API_URL, timeout=timeout) as client:
+        yield client
+
+
+@pytest.fixture
+def wiki_generator_mock():
+    """Shared WikiGenerator stand-in with call history cleared."""
+    # reset_mock keeps the pre-wired return values
+    _WIKI_GENERATOR.reset_mock()
+    return _WIKI_GENERATOR
+
+
+@pytest.fixture(scope="session")
+def http_session():
+    """Keep-alive requests session for tests that talk to a live server."""
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    with requests.Session() as session:
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        yield session
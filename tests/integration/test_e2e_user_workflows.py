@@ -3,78 +3,185 @@ End-to-End User Workflow Integration Tests for Grantha API.
 Tests complete user journeys and workflows.
 """
 
+import asyncio
+import httpx
+import numpy as np
+import orjson
+import os
 import pytest
-import requests
+import pytest_asyncio
 import json
-import time
 from typing import Dict, Any
 
+from tests.utils import rjson
+
 # Test configuration
 API_BASE_URL = "http://localhost:8000"
 FRONTEND_URL = "http://localhost:3000"
-TEST_TIMEOUT = 30
+# Connection failures surface after CONNECT_TIMEOUT everywhere; light
+# endpoints override live_client's long default read timeout, which is
+# kept for the LLM-backed ones
+CONNECT_TIMEOUT = 3
+FAST_TIMEOUT = httpx.Timeout(3, connect=CONNECT_TIMEOUT)
+
+# Provider sent by the workflow tests; set GRANTHA_TEST_PROVIDER=google to
+# exercise a real LLM instead of the mock provider
+PROVIDER = os.environ.get("GRANTHA_TEST_PROVIDER", "mock")
+MODEL = "mock-model" if PROVIDER == "mock" else "gemini-pro"
+GENERATION_MODEL = "mock-model" if PROVIDER == "mock" else "gemini-2.0-flash-exp"
+
+# Chat fields shared by most requests; only the query usually varies
+CHAT_BASE = {"provider": PROVIDER, "model": MODEL}
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Model asked for each provider in the multi-model comparison
+COMPARISON_MODELS = {"google": "gemini-pro"}
+INVALID_CHAT_BODY = orjson.dumps({"invalid": "data"})  # Missing required fields
+
+
+def chat_body(user_query, **overrides):
+    """Serialize a /simple/chat request body with orjson."""
+    return orjson.dumps({**CHAT_BASE, "user_query": user_query, **overrides})
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_config(live_client):
+    """Probe the API and fetch its idempotent config endpoints once per session."""
+    try:
+        health = await live_client.get("/health", timeout=FAST_TIMEOUT)
+        health_ok = health.status_code == 200
+    except httpx.HTTPError:
+        health_ok = False
+    
+    if not health_ok:
+        return {"health_ok": False, "auth": None, "models": None}
+    
+    auth, models = await asyncio.gather(
+        live_client.get("/auth/status", timeout=FAST_TIMEOUT),
+        live_client.get("/models/config", timeout=FAST_TIMEOUT),
+    )
+    return {"health_ok": True, "auth": rjson(auth), "models": rjson(models)}
+
+
+# Workflow steps that don't depend on each other are separate parametrized
+# cases, so pytest-xdist can schedule each one on whichever worker is free
+
+async def _onboarding_access(client):
+    """User accesses the application."""
+    response = await client.get("/", timeout=FAST_TIMEOUT)
+    assert response.status_code == 200
+    app_info = rjson(response)
+    print(f"✓ Application: {app_info.get('name', 'Grantha API')}")
+
+
+async def _onboarding_auth(client):
+    """Check if authentication is required."""
+    auth_response = await client.get("/auth/status", timeout=FAST_TIMEOUT)
+    assert auth_response.status_code == 200
+    auth_status = rjson(auth_response)
+    print(f"✓ Auth required: {auth_status.get('auth_required', False)}")
+
+
+async def _onboarding_models(client):
+    """Get available models and providers."""
+    models_response = await client.get("/models/config", timeout=FAST_TIMEOUT)
+    assert models_response.status_code == 200
+    models_config = rjson(models_response)
+    print(f"✓ Available providers: {len(models_config.get('providers', []))}")
+    print(f"✓ Default provider: {models_config.get('defaultProvider', 'google')}")
+
+
+async def _onboarding_chat(client):
+    """First interaction - simple chat."""
+    chat_response = await client.post(
+        "/simple/chat",
+        content=chat_body("Hello! What can you help me with?"),
+        headers=JSON_HEADERS
+    )
+    assert chat_response.status_code == 200
+    chat_data = rjson(chat_response)
+    assert "message" in chat_data
+    assert "status" in chat_data
+    print(f"✓ First interaction successful: {chat_data['status']}")
+
+
+ONBOARDING_STEPS = {
+    "access": _onboarding_access,
+    "auth": _onboarding_auth,
+    "models": _onboarding_models,
+    "chat": _onboarding_chat,
+}
+
+
+async def _recovery_invalid_input(client):
+    """Invalid input is rejected."""
+    invalid_response = await client.post(
+        "/simple/chat",
+        content=INVALID_CHAT_BODY,
+        headers=JSON_HEADERS,
+        timeout=FAST_TIMEOUT
+    )
+    assert invalid_response.status_code == 422
+    print("✓ Invalid input properly rejected")
+
+
+async def _recovery_valid_input(client):
+    """Valid input is processed."""
+    # Only the status matters, so don't download the generated answer
+    async with client.stream(
+        "POST",
+        "/simple/chat",
+        content=chat_body("This is a valid query"),
+        headers=JSON_HEADERS
+    ) as valid_response:
+        assert valid_response.status_code == 200
+    print("✓ Valid input processed successfully")
+
+
+async def _recovery_not_found(client):
+    """Non-existent endpoints return 404."""
+    not_found_response = await client.get("/nonexistent", timeout=FAST_TIMEOUT)
+    assert not_found_response.status_code == 404
+    print("✓ Non-existent endpoint properly handled")
+
+
+async def _recovery_concurrent(client):
+    """Concurrent requests are served."""
+    results = await asyncio.gather(
+        *(client.get("/health", timeout=FAST_TIMEOUT) for _ in range(5))
+    )
+    
+    successful_requests = sum(1 for r in results if r.status_code == 200)
+    print(f"✓ {successful_requests}/5 concurrent requests successful")
+    assert successful_requests >= 4  # Allow for some variability
+
+
+RECOVERY_STEPS = {
+    "invalid_input": _recovery_invalid_input,
+    "valid_input": _recovery_valid_input,
+    "not_found": _recovery_not_found,
+    "concurrent": _recovery_concurrent,
+}
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestE2EUserWorkflows:
     """End-to-end user workflow tests."""
     
-    @pytest.fixture(autouse=True)
-    def setup_method(self):
-        """Setup method run before each test."""
-        # Verify API is available
-        try:
-            response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-            if response.status_code != 200:
-                pytest.skip("API server not available")
-        except requests.exceptions.RequestException:
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _api_alive(cls, api_config):
+        """Skip the class once if the session health probe failed."""
+        if not api_config["health_ok"]:
             pytest.skip("API server not available")
 
-    def test_new_user_onboarding_workflow(self):
-        """Test complete new user onboarding workflow."""
-        print("\n🚀 Testing New User Onboarding Workflow")
-        
-        # Step 1: User accesses the application
-        print("Step 1: Accessing application...")
-        response = requests.get(f"{API_BASE_URL}/")
-        assert response.status_code == 200
-        app_info = response.json()
-        print(f"✓ Application: {app_info.get('name', 'Grantha API')}")
-        
-        # Step 2: Check if authentication is required
-        print("Step 2: Checking authentication requirements...")
-        auth_response = requests.get(f"{API_BASE_URL}/auth/status")
-        assert auth_response.status_code == 200
-        auth_status = auth_response.json()
-        print(f"✓ Auth required: {auth_status.get('auth_required', False)}")
-        
-        # Step 3: Get available models and providers
-        print("Step 3: Getting available models...")
-        models_response = requests.get(f"{API_BASE_URL}/models/config")
-        assert models_response.status_code == 200
-        models_config = models_response.json()
-        print(f"✓ Available providers: {len(models_config.get('providers', []))}")
-        print(f"✓ Default provider: {models_config.get('defaultProvider', 'google')}")
-        
-        # Step 4: First interaction - simple chat
-        print("Step 4: First chat interaction...")
-        chat_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={
-                "user_query": "Hello! What can you help me with?",
-                "provider": models_config.get('defaultProvider', 'google'),
-                "model": "gemini-pro"
-            },
-            timeout=TEST_TIMEOUT
-        )
-        assert chat_response.status_code == 200
-        chat_data = chat_response.json()
-        assert "message" in chat_data
-        assert "status" in chat_data
-        print(f"✓ First interaction successful: {chat_data['status']}")
-        
-        print("✅ New User Onboarding Workflow Complete!")
+    @pytest.mark.parametrize("step", list(ONBOARDING_STEPS))
+    async def test_new_user_onboarding_workflow(self, live_client, step):
+        """Test one step of the new user onboarding workflow."""
+        print(f"\n🚀 Testing New User Onboarding Workflow: {step}")
+        await ONBOARDING_STEPS[step](live_client)
+        print(f"✅ Onboarding step '{step}' complete!")
 
-    def test_documentation_generation_workflow(self):
+    async def test_documentation_generation_workflow(self, live_client, api_config):
         """Test complete documentation generation workflow."""
         print("\n📚 Testing Documentation Generation Workflow")
         
@@ -83,15 +190,15 @@ class TestE2EUserWorkflows:
         print(f"Step 1: Selected repository: {repo_url}")
         
         # Step 2: Check authentication if required
-        auth_response = requests.get(f"{API_BASE_URL}/auth/status")
-        auth_data = auth_response.json()
+        auth_data = api_config["auth"]
         
         if auth_data.get('auth_required', False):
             print("Step 2: Authentication required - simulating validation...")
             # In real scenario, user would provide auth code
-            validate_response = requests.post(
-                f"{API_BASE_URL}/auth/validate",
-                json={"code": "test_code"}
+            validate_response = await live_client.post(
+                "/auth/validate",
+                json={"code": "test_code"},
+                timeout=FAST_TIMEOUT
             )
             assert validate_response.status_code == 200
         else:
@@ -99,18 +206,18 @@ class TestE2EUserWorkflows:
         
         # Step 3: Generate wiki documentation
         print("Step 3: Generating wiki documentation...")
-        wiki_response = requests.post(
-            f"{API_BASE_URL}/wiki/generate",
-            json={
+        wiki_response = await live_client.post(
+            "/wiki/generate",
+            content=orjson.dumps({
                 "repo_url": repo_url,
                 "language": "en",
-                "provider": "google",
-                "model": "gemini-2.0-flash-exp"
-            },
-            timeout=TEST_TIMEOUT
+                "provider": PROVIDER,
+                "model": GENERATION_MODEL
+            }),
+            headers=JSON_HEADERS
         )
         assert wiki_response.status_code == 200
-        wiki_data = wiki_response.json()
+        wiki_data = rjson(wiki_response)
         assert "wiki_structure" in wiki_data
         assert wiki_data["status"] == "success"
         
@@ -126,7 +233,7 @@ class TestE2EUserWorkflows:
         
         print("✅ Documentation Generation Workflow Complete!")
 
-    def test_interactive_research_workflow(self):
+    async def test_interactive_research_workflow(self, live_client):
         """Test interactive research and Q&A workflow."""
         print("\n🔍 Testing Interactive Research Workflow")
         
@@ -134,66 +241,65 @@ class TestE2EUserWorkflows:
         
         # Step 1: Initial research question
         print("Step 1: Asking initial research question...")
-        research_response = requests.post(
-            f"{API_BASE_URL}/research/deep",
-            json={
+        research_response = await live_client.post(
+            "/research/deep",
+            content=orjson.dumps({
                 "query": "What are the main architectural components of this system?",
                 "repo_url": repo_url,
                 "language": "en",
-                "provider": "google",
-                "model": "gemini-2.0-flash-exp"
-            },
-            timeout=TEST_TIMEOUT
+                "provider": PROVIDER,
+                "model": GENERATION_MODEL
+            }),
+            headers=JSON_HEADERS
         )
         assert research_response.status_code == 200
-        research_data = research_response.json()
+        research_data = rjson(research_response)
         assert "results" in research_data
         assert "status" in research_data
         print(f"✓ Research completed: {research_data['status']}")
         
-        # Step 2: Follow-up questions based on research
-        print("Step 2: Follow-up chat based on research...")
-        follow_up_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={
-                "user_query": "Can you explain more about the extension system?",
-                "provider": "google",
-                "model": "gemini-pro"
-            },
-            timeout=TEST_TIMEOUT
+        # Steps 2-3 are independent of each other, so run them side by side
+        print("Steps 2-3: Follow-up chat and RAG-based specific query...")
+        follow_up_response, rag_response = await asyncio.gather(
+            live_client.post(
+                "/simple/chat",
+                content=chat_body("Can you explain more about the extension system?"),
+                headers=JSON_HEADERS
+            ),
+            live_client.post(
+                "/simple/rag",
+                content=orjson.dumps({
+                    "query": "How is authentication handled?",
+                    "repo_url": repo_url,
+                    "provider": PROVIDER,
+                    "model": MODEL
+                }),
+                headers=JSON_HEADERS
+            ),
         )
+        
+        # Step 2: Follow-up questions based on research
         assert follow_up_response.status_code == 200
-        follow_up_data = follow_up_response.json()
+        follow_up_data = rjson(follow_up_response)
         assert "message" in follow_up_data
         print(f"✓ Follow-up answered: {len(follow_up_data['message'])} characters")
         
         # Step 3: RAG-based specific query
-        print("Step 3: RAG-based specific query...")
-        rag_response = requests.post(
-            f"{API_BASE_URL}/simple/rag",
-            json={
-                "query": "How is authentication handled?",
-                "repo_url": repo_url,
-                "provider": "mock",
-                "model": "mock-model"
-            },
-            timeout=TEST_TIMEOUT
-        )
         assert rag_response.status_code == 200
-        rag_data = rag_response.json()
+        rag_data = rjson(rag_response)
         assert "answer" in rag_data
         assert "sources" in rag_data
         print(f"✓ RAG query completed with {len(rag_data['sources'])} sources")
         
         print("✅ Interactive Research Workflow Complete!")
 
-    def test_multi_model_comparison_workflow(self):
+    @pytest.mark.llm
+    async def test_multi_model_comparison_workflow(self, live_client, api_config):
         """Test workflow using multiple AI models for comparison."""
         print("\n🤖 Testing Multi-Model Comparison Workflow")
         
         # Step 1: Get available models
-        models_response = requests.get(f"{API_BASE_URL}/models/config")
-        models_config = models_response.json()
+        models_config = api_config["models"]
         providers = models_config.get('providers', [])
         
         if not providers:
@@ -209,24 +315,32 @@ class TestE2EUserWorkflows:
         # Test with different providers if available
         test_providers = ["google"]  # Add more as they become available
         
-        for provider in test_providers:
-            print(f"Step 2.{len(responses)+1}: Asking {provider}...")
-            try:
-                response = requests.post(
-                    f"{API_BASE_URL}/simple/chat",
-                    json={
-                        "user_query": question,
-                        "provider": provider,
-                        "model": "gemini-pro" if provider == "google" else "default"
-                    },
-                    timeout=TEST_TIMEOUT
+        # Every provider gets the question at once, so the step takes as long
+        # as the slowest provider rather than the sum of all of them
+        print(f"Step 2: Asking {', '.join(test_providers)}...")
+        results = await asyncio.gather(
+            *(
+                live_client.post(
+                    "/simple/chat",
+                    content=chat_body(
+                        question,
+                        provider=provider,
+                        model=COMPARISON_MODELS.get(provider, "default")
+                    ),
+                    headers=JSON_HEADERS
                 )
-                if response.status_code == 200:
-                    data = response.json()
-                    responses[provider] = data
-                    print(f"✓ {provider} response: {len(data.get('message', ''))} characters")
-            except Exception as e:
-                print(f"⚠️ {provider} failed: {e}")
+                for provider in test_providers
+            ),
+            return_exceptions=True
+        )
+        
+        for provider, response in zip(test_providers, results):
+            if isinstance(response, Exception):
+                print(f"⚠️ {provider} failed: {response}")
+            elif response.status_code == 200:
+                data = rjson(response)
+                responses[provider] = data
+                print(f"✓ {provider} response: {len(data.get('message', ''))} characters")
         
         # Step 3: Compare responses
         print("Step 3: Comparing responses...")
@@ -238,94 +352,46 @@ class TestE2EUserWorkflows:
         
         print("✅ Multi-Model Comparison Workflow Complete!")
 
-    def test_error_handling_and_recovery_workflow(self):
-        """Test user workflow with error conditions and recovery."""
-        print("\n⚠️ Testing Error Handling and Recovery Workflow")
-        
-        # Step 1: Test with invalid input
-        print("Step 1: Testing invalid input handling...")
-        invalid_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={"invalid": "data"}  # Missing required fields
-        )
-        assert invalid_response.status_code == 422
-        print("✓ Invalid input properly rejected")
-        
-        # Step 2: Recovery with valid input
-        print("Step 2: Recovering with valid input...")
-        valid_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={
-                "user_query": "This is a valid query",
-                "provider": "google",
-                "model": "gemini-pro"
-            },
-            timeout=TEST_TIMEOUT
-        )
-        assert valid_response.status_code == 200
-        print("✓ Valid input processed successfully")
-        
-        # Step 3: Test with non-existent endpoint
-        print("Step 3: Testing non-existent endpoint...")
-        not_found_response = requests.get(f"{API_BASE_URL}/nonexistent")
-        assert not_found_response.status_code == 404
-        print("✓ Non-existent endpoint properly handled")
-        
-        # Step 4: Test rate limiting / performance under load
-        print("Step 4: Testing concurrent requests...")
-        import concurrent.futures
-        
-        def make_request():
-            return requests.get(f"{API_BASE_URL}/health", timeout=5)
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(make_request) for _ in range(5)]
-            results = [f.result() for f in concurrent.futures.as_completed(futures)]
-        
-        successful_requests = sum(1 for r in results if r.status_code == 200)
-        print(f"✓ {successful_requests}/5 concurrent requests successful")
-        assert successful_requests >= 4  # Allow for some variability
-        
-        print("✅ Error Handling and Recovery Workflow Complete!")
+    @pytest.mark.parametrize("step", list(RECOVERY_STEPS))
+    async def test_error_handling_and_recovery_workflow(self, live_client, step):
+        """Test one error condition or recovery step of the user workflow."""
+        print(f"\n⚠️ Testing Error Handling and Recovery Workflow: {step}")
+        await RECOVERY_STEPS[step](live_client)
+        print(f"✅ Recovery step '{step}' complete!")
 
-    def test_session_persistence_workflow(self):
+    async def test_session_persistence_workflow(self, live_client):
         """Test user session persistence across multiple interactions."""
         print("\n💾 Testing Session Persistence Workflow")
         
         # Step 1: Start a conversation
         print("Step 1: Starting conversation...")
-        first_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={
-                "user_query": "Hello, I'm starting a new conversation",
-                "provider": "google",
-                "model": "gemini-pro"
-            },
-            timeout=TEST_TIMEOUT
-        )
-        assert first_response.status_code == 200
+        # Only statuses are checked here, so skip downloading the answers
+        async with live_client.stream(
+            "POST",
+            "/simple/chat",
+            content=chat_body("Hello, I'm starting a new conversation"),
+            headers=JSON_HEADERS
+        ) as first_response:
+            assert first_response.status_code == 200
         print("✓ First message sent")
         
         # Step 2: Continue conversation
         print("Step 2: Continuing conversation...")
-        second_response = requests.post(
-            f"{API_BASE_URL}/simple/chat",
-            json={
-                "user_query": "Can you remember what I just said?",
-                "provider": "google",
-                "model": "gemini-pro"
-            },
-            timeout=TEST_TIMEOUT
-        )
-        assert second_response.status_code == 200
+        async with live_client.stream(
+            "POST",
+            "/simple/chat",
+            content=chat_body("Can you remember what I just said?"),
+            headers=JSON_HEADERS
+        ) as second_response:
+            assert second_response.status_code == 200
         print("✓ Second message sent")
         
         # Step 3: Check different endpoints maintain state
         print("Step 3: Testing different endpoints...")
-        models_response = requests.get(f"{API_BASE_URL}/models/config")
+        models_response = await live_client.get("/models/config", timeout=FAST_TIMEOUT)
         assert models_response.status_code == 200
         
-        health_response = requests.get(f"{API_BASE_URL}/health")
+        health_response = await live_client.get("/health", timeout=FAST_TIMEOUT)
         assert health_response.status_code == 200
         
         print("✓ Different endpoints accessible")
@@ -340,72 +406,69 @@ class TestE2EPerformanceWorkflows:
     """Performance-focused end-to-end workflow tests."""
     
     @pytest.mark.slow
-    def test_high_load_user_workflow(self):
+    @pytest.mark.xdist_group("serial")
+    @pytest.mark.benchmark(group="e2e-load")
+    def test_high_load_user_workflow(self, benchmark):
         """Test user workflow under high load conditions."""
         print("\n🚀 Testing High Load User Workflow")
         
-        import concurrent.futures
-        import threading
-        import time
-        
         # Simulate multiple users performing workflows simultaneously
-        def user_workflow(user_id):
+        async def user_workflow(client, user_id, successes, durations):
+            # Each user performs a complete workflow and records its outcome
+            # in its own slot of the preallocated result arrays
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
             try:
-                # Each user performs a complete workflow
-                start_time = time.time()
-                
                 # Health check
-                health = requests.get(f"{API_BASE_URL}/health", timeout=5)
+                health = await client.get("/health", timeout=httpx.Timeout(5, connect=CONNECT_TIMEOUT))
                 
                 # Chat interaction
-                chat = requests.post(
-                    f"{API_BASE_URL}/simple/chat",
-                    json={
-                        "user_query": f"User {user_id} asks: What is Python?",
-                        "provider": "google",
-                        "model": "gemini-pro"
-                    },
-                    timeout=15
+                chat = await client.post(
+                    "/simple/chat",
+                    content=chat_body(f"User {user_id} asks: What is Python?"),
+                    headers=JSON_HEADERS,
+                    timeout=httpx.Timeout(15, connect=CONNECT_TIMEOUT)
                 )
                 
-                end_time = time.time()
-                
-                return {
-                    "user_id": user_id,
-                    "success": health.status_code == 200 and chat.status_code == 200,
-                    "duration": end_time - start_time,
-                    "health_status": health.status_code,
-                    "chat_status": chat.status_code
-                }
+                successes[user_id] = health.status_code == 200 and chat.status_code == 200
             except Exception as e:
-                return {
-                    "user_id": user_id,
-                    "success": False,
-                    "error": str(e),
-                    "duration": 0
-                }
+                print(f"⚠️ User {user_id} failed: {e}")
+            finally:
+                durations[user_id] = loop.time() - start_time
+        
+        # All users share one connection pool and run on a single event loop
+        async def run_users(num_users):
+            successes = np.zeros(num_users, dtype=bool)
+            durations = np.empty(num_users)
+            async with httpx.AsyncClient(base_url=API_BASE_URL) as client:
+                await asyncio.gather(
+                    *(user_workflow(client, i, successes, durations) for i in range(num_users))
+                )
+            return successes, durations
+        
+        def run_load(num_users):
+            return asyncio.run(run_users(num_users))
         
         # Test with 10 concurrent users
         num_users = 10
         print(f"Step 1: Simulating {num_users} concurrent users...")
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_users) as executor:
-            futures = [executor.submit(user_workflow, i) for i in range(num_users)]
-            results = [future.result() for future in concurrent.futures.as_completed(futures)]
+        # One round: repeating the whole load only multiplies the runtime,
+        # and under xdist pytest-benchmark disables itself anyway
+        successes, durations = benchmark.pedantic(
+            run_load, args=(num_users,), rounds=1, warmup_rounds=0
+        )
         
         # Analyze results
-        successful_users = sum(1 for r in results if r["success"])
-        avg_duration = sum(r["duration"] for r in results if "duration" in r) / len(results)
-        max_duration = max(r.get("duration", 0) for r in results)
-        
+        successful_users = int(successes.sum())
+        p50, p95, p99 = np.percentile(durations, [50, 95, 99])
         print(f"✓ Successful users: {successful_users}/{num_users}")
-        print(f"✓ Average duration: {avg_duration:.2f}s")
-        print(f"✓ Max duration: {max_duration:.2f}s")
+        print(f"✓ Per-user duration: p50={p50:.2f}s p95={p95:.2f}s p99={p99:.2f}s")
         
         # Assertions for performance
         assert successful_users >= num_users * 0.8  # 80% success rate
-        assert avg_duration < 20.0  # Average under 20 seconds
-        assert max_duration < 30.0  # Max under 30 seconds
+        assert durations.mean() < 20.0  # Average under 20 seconds
+        assert durations.max() < 30.0  # Max under 30 seconds
         
         print("✅ High Load User Workflow Complete!")
 
@@ -1,6 +1,7 @@
 """
 Comprehensive integration tests for Grantha API endpoints.
-Tests the complete API functionality against live servers.
+Tests the complete API functionality against live servers; response-shape
+contract tests run against the app in-process.
 """
 
 import pytest
@@ -10,114 +11,282 @@ import time
 import requests
 from typing import Dict, Any
 from unittest.mock import patch, Mock
+from fastapi.testclient import TestClient
 
 # Test configuration
 API_BASE_URL = "http://localhost:8000"
 FRONTEND_URL = "http://localhost:3000"
 TEST_TIMEOUT = 30
 
+# Canned LLM output and wiki structure for the in-process endpoint tests
+MOCK_LLM_TEXT = "Mocked LLM response"
+MOCK_WIKI_STRUCTURE = {
+    "id": "wiki_test_repo",
+    "title": "Test Wiki",
+    "pages": [{"id": "overview", "title": "Overview", "content": MOCK_LLM_TEXT}],
+}
 
-class TestGranthaAPIIntegration:
-    """Integration test suite for Grantha API endpoints."""
-    
-    @pytest.fixture(autouse=True)
-    def setup_method(self):
-        """Setup method run before each test."""
-        # Wait for API to be ready
-        max_retries = 10
-        for _ in range(max_retries):
-            try:
-                response = requests.get(f"{API_BASE_URL}/health", timeout=2)
-                if response.status_code == 200:
-                    break
-            except requests.exceptions.RequestException:
-                time.sleep(1)
-        else:
-            pytest.skip("API server not available")
 
-    def test_health_endpoint(self):
-        """Test API health check endpoint."""
-        response = requests.get(f"{API_BASE_URL}/health")
+@pytest.fixture(scope="session")
+def api_ready(http_session):
+    """Wait for the API once per session, backing off exponentially."""
+    delay = 0.05
+    for _ in range(8):
+        try:
+            if http_session.get(f"{API_BASE_URL}/health", timeout=1).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay *= 2
+    return False
+
+
+@pytest.fixture
+def warm_http_session(http_session):
+    """http_session with live keep-alive connections to the API.
+    
+    Timing tests use this so they measure server latency, not the TCP
+    connect paid by the first request. Warmed per test rather than per
+    session because uvicorn drops idle keep-alive connections after 5s.
+    """
+    for _ in range(2):
+        http_session.get(f"{API_BASE_URL}/health", timeout=1)
+    return http_session
+
+
+@pytest.fixture(scope="session")
+def local_client():
+    """In-process client for contract tests that don't need a live server."""
+    # Imported here so the live-server tests don't pay for building the app
+    from src.grantha.api.app import create_app
+    from src.grantha.api.middleware import RateLimitingMiddleware
+    
+    with pytest.MonkeyPatch.context() as mp:
+        # Every request here comes from one client identity, and the limiter
+        # counts them all against the strictest route's budget (10/min for
+        # /research), so lift the limits rather than fail part-way through
+        mp.setattr(RateLimitingMiddleware, "get_rate_limit", lambda self, path: (10_000, 60))
+        with TestClient(create_app()) as client:
+            yield client
+
+
+# (path, expected status, check on the decoded body) for the single-GET
+# shape tests; check is None when the body isn't inspected
+GET_SHAPES = [
+    pytest.param("/health", 200, lambda data: data["status"] == "healthy", id="health"),
+    pytest.param(
+        "/",
+        200,
+        lambda data: "ग्रंथ" in data["name"] and "version" in data and "description" in data,
+        id="root",
+    ),
+    pytest.param("/auth/status", 200, lambda data: isinstance(data["auth_required"], bool), id="auth_status"),
+    pytest.param("/auth/lang/config", 200, lambda data: isinstance(data, dict), id="lang_config"),
+    pytest.param(
+        "/models/config",
+        200,
+        lambda data: isinstance(data["providers"], list) and "defaultProvider" in data,
+        id="models_config",
+    ),
+    pytest.param("/nonexistent", 404, None, id="not_found"),
+]
+
+# (path, request kwargs, accepted statuses) for requests the API must reject
+INVALID_POSTS = [
+    pytest.param(
+        "/simple/chat",
+        {"content": "invalid json", "headers": {"Content-Type": "application/json"}},
+        [422],
+        id="invalid_json",
+    ),
+    # Missing user_query
+    pytest.param("/simple/chat", {"json": {"provider": "google"}}, [422], id="missing_fields"),
+    # May return 422 for validation error or 501 for not implemented
+    pytest.param(
+        "/wiki/cache",
+        {"json": {"repo_url": "https://github.com/test/repo", "cache_data": {"test": "data"}}},
+        [422, 501],
+        id="wiki_cache",
+    ),
+    pytest.param(
+        "/wiki/export",
+        {"json": {"format": "markdown", "pages": [{"id": "test", "title": "Test", "content": "Test"}]}},
+        [422, 501],
+        id="wiki_export",
+    ),
+]
+
+
+class TestGranthaAPIContract:
+    """Response-shape tests run against the app in-process, without sockets."""
+    
+    @pytest.mark.parametrize("path, expected_status, check", GET_SHAPES)
+    def test_get_endpoint_shape(self, local_client, path, expected_status, check):
+        """Test each read-only endpoint's status code and response shape."""
+        response = local_client.get(path)
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
+        assert response.status_code == expected_status
+        if check is not None:
+            assert check(response.json())
 
-    def test_root_endpoint(self):
-        """Test root endpoint returns API information."""
-        response = requests.get(f"{API_BASE_URL}/")
+    @pytest.mark.parametrize("path, request_kwargs, expected_statuses", INVALID_POSTS)
+    def test_rejects_invalid_request(self, local_client, path, request_kwargs, expected_statuses):
+        """Test endpoints reject malformed or incomplete payloads."""
+        response = local_client.post(path, **request_kwargs)
         
-        assert response.status_code == 200
-        data = response.json()
-        assert "name" in data
-        assert "ग्रंथ" in data["name"]
-        assert "version" in data
-        assert "description" in data
+        assert response.status_code in expected_statuses
+        assert "detail" in response.json()
 
-    def test_openapi_documentation(self):
+    def test_openapi_documentation(self, local_client):
         """Test OpenAPI documentation is available."""
-        response = requests.get(f"{API_BASE_URL}/docs")
+        # HEAD is enough to show the Swagger page is served; skip its body
+        response = local_client.head("/docs")
         assert response.status_code == 200
-        assert "swagger" in response.text.lower()
+        assert response.headers["content-type"].startswith("text/html")
         
         # Test OpenAPI JSON schema
-        response = requests.get(f"{API_BASE_URL}/openapi.json")
+        response = local_client.get("/openapi.json")
         assert response.status_code == 200
         schema = response.json()
         assert "paths" in schema
         assert "info" in schema
 
-    def test_cors_headers(self):
-        """Test CORS headers are properly configured."""
-        # Test with GET request since OPTIONS may not be implemented
-        response = requests.get(f"{API_BASE_URL}/", 
-                               headers={"Origin": "http://localhost:3000"})
+
+
+@pytest.fixture
+def mock_llm(monkeypatch, tmp_path):
+    """Replace the Gemini model and wiki pipeline behind the LLM-backed routes."""
+    from src.grantha.api import routes
+    
+    gemini = Mock(spec=["generate_content"])
+    gemini.generate_content.return_value = Mock(text=MOCK_LLM_TEXT)
+    monkeypatch.setattr(routes, "gemini_model", gemini)
+    
+    # /wiki/generate imports these lazily, so patch them where they're defined
+    wiki_generator = Mock(spec=["generate_wiki_structure"])
+    wiki_generator.generate_wiki_structure.return_value = MOCK_WIKI_STRUCTURE
+    monkeypatch.setattr(routes, "WIKI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("src.grantha.utils.data_pipeline.download_repo", Mock(return_value=str(tmp_path)))
+    monkeypatch.setattr("src.grantha.utils.wiki_generator.WikiGenerator", Mock(return_value=wiki_generator))
+    monkeypatch.setattr("src.grantha.utils.project_storage.ProjectStorage", Mock())
+    return gemini
+
+
+class TestGranthaAPIMockedLLM:
+    """LLM-backed endpoints run in-process with the model calls mocked out."""
+    
+    @pytest.fixture(autouse=True)
+    def _llm(self, mock_llm):
+        """Keep every test in this class off the real LLM provider."""
+        self.gemini = mock_llm
+
+    def test_simple_chat_endpoint(self, local_client):
+        """Test simple chat endpoint returns the model's answer."""
+        response = local_client.post(
+            "/simple/chat",
+            json={"user_query": "Hello, test message", "provider": "google", "model": "gemini-pro"}
+        )
         
         assert response.status_code == 200
-        # CORS headers should be present in actual requests
-        assert "access-control-allow-origin" in response.headers or True  # May not show in all responses
+        data = response.json()
+        assert data["message"] == MOCK_LLM_TEXT
+        assert data["provider"] == "google"
+        assert data["model"] == "gemini-pro"
+        assert data["status"] == "success"
+        self.gemini.generate_content.assert_called_once_with("Hello, test message")
 
-    def test_auth_status_endpoint(self):
-        """Test authentication status endpoint."""
-        response = requests.get(f"{API_BASE_URL}/auth/status")
+    def test_chat_completion_endpoint(self, local_client):
+        """Test chat completion endpoint."""
+        response = local_client.post(
+            "/chat/completion",
+            json={
+                "messages": [{"role": "user", "content": "What is Python programming?"}],
+                "model": "gemini-pro",
+                "provider": "google"
+            }
+        )
         
         assert response.status_code == 200
         data = response.json()
-        assert "auth_required" in data
-        assert isinstance(data["auth_required"], bool)
+        assert data["content"] == MOCK_LLM_TEXT
+        assert data["model"] == "gemini-pro"
+        assert data["provider"] == "google"
 
-    def test_auth_validate_endpoint(self):
-        """Test authorization code validation endpoint."""
-        response = requests.post(
-            f"{API_BASE_URL}/auth/validate", 
-            json={"code": "test_code"}
+    def test_wiki_generate_endpoint(self, local_client):
+        """Test wiki generation endpoint."""
+        response = local_client.post(
+            "/wiki/generate",
+            json={
+                "repo_url": "https://github.com/example/test-repo",
+                "language": "en",
+                "provider": "google",
+                "model": "gemini-2.0-flash-exp"
+            }
         )
         
         assert response.status_code == 200
         data = response.json()
-        assert "success" in data
-        assert isinstance(data["success"], bool)
+        assert data["status"] == "success"
+        assert data["provider"] == "google"
+        assert data["model"] == "gemini-2.0-flash-exp"
+        assert data["wiki_structure"] == MOCK_WIKI_STRUCTURE
 
-    def test_auth_lang_config_endpoint(self):
-        """Test language configuration endpoint."""
-        response = requests.get(f"{API_BASE_URL}/auth/lang/config")
+    def test_research_deep_endpoint(self, local_client):
+        """Test deep research endpoint."""
+        research_data = {
+            "query": "How does authentication work in this system?",
+            "repo_url": "https://github.com/example/test-repo",
+            "language": "en",
+            "provider": "google",
+            "model": "gemini-2.0-flash-exp"
+        }
+        
+        response = local_client.post("/research/deep", json=research_data)
         
         assert response.status_code == 200
         data = response.json()
-        # Should return language configuration
-        assert isinstance(data, dict)
+        assert data["results"] == MOCK_LLM_TEXT
+        assert data["status"] == "success"
+        assert data["query"] == research_data["query"]
+        assert data["repo_url"] == research_data["repo_url"]
+        assert data["language"] == "en"
+
+
+class TestGranthaAPIIntegration:
+    """Integration test suite for Grantha API endpoints."""
+    
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _api_alive(cls, api_ready):
+        """Skip the class once if the API never became ready."""
+        if not api_ready:
+            pytest.skip("API server not available")
+
+    def test_cors_headers(self, http_session):
+        """Test CORS headers are properly configured."""
+        # Test with GET request since OPTIONS may not be implemented
+        response = http_session.get(f"{API_BASE_URL}/", 
+                               headers={"Origin": "http://localhost:3000"})
+        
+        assert response.status_code == 200
+        # CORS headers should be present in actual requests
+        assert "access-control-allow-origin" in response.headers or True  # May not show in all responses
 
-    def test_models_config_endpoint(self):
-        """Test model configuration endpoint."""
-        response = requests.get(f"{API_BASE_URL}/models/config")
+    def test_auth_validate_endpoint(self, http_session):
+        """Test authorization code validation endpoint."""
+        response = http_session.post(
+            f"{API_BASE_URL}/auth/validate", 
+            json={"code": "test_code"}
+        )
         
         assert response.status_code == 200
         data = response.json()
-        assert "providers" in data
-        assert "defaultProvider" in data
-        assert isinstance(data["providers"], list)
+        assert "success" in data
+        assert isinstance(data["success"], bool)
 
-    def test_simple_chat_endpoint(self):
+    @pytest.mark.llm
+    def test_simple_chat_endpoint(self, http_session):
         """Test simple chat endpoint functionality."""
         chat_data = {
             "user_query": "Hello, test message",
@@ -125,7 +294,7 @@ class TestGranthaAPIIntegration:
             "model": "gemini-pro"
         }
         
-        response = requests.post(
+        response = http_session.post(
             f"{API_BASE_URL}/simple/chat", 
             json=chat_data,
             timeout=TEST_TIMEOUT
@@ -141,7 +310,7 @@ class TestGranthaAPIIntegration:
         # Should have actual response or fallback
         assert data["status"] in ["success", "fallback", "no_api_key"]
 
-    def test_simple_rag_endpoint(self):
+    def test_simple_rag_endpoint(self, http_session):
         """Test simple RAG endpoint functionality."""
         rag_data = {
             "query": "How does this work?",
@@ -150,7 +319,7 @@ class TestGranthaAPIIntegration:
             "model": "mock-model"
         }
         
-        response = requests.post(
+        response = http_session.post(
             f"{API_BASE_URL}/simple/rag", 
             json=rag_data,
             timeout=TEST_TIMEOUT
@@ -165,7 +334,8 @@ class TestGranthaAPIIntegration:
         assert "status" in data
         assert data["status"] == "success"
 
-    def test_chat_completion_endpoint(self):
+    @pytest.mark.llm
+    def test_chat_completion_endpoint(self, http_session):
         """Test chat completion endpoint."""
         chat_data = {
             "messages": [
@@ -175,7 +345,7 @@ class TestGranthaAPIIntegration:
             "provider": "google"
         }
         
-        response = requests.post(
+        response = http_session.post(
             f"{API_BASE_URL}/chat/completion", 
             json=chat_data,
             timeout=TEST_TIMEOUT
@@ -190,7 +360,8 @@ class TestGranthaAPIIntegration:
         # Check for content presence instead of role field
         assert len(data["content"]) > 0
 
-    def test_wiki_generate_endpoint(self):
+    @pytest.mark.llm
+    def test_wiki_generate_endpoint(self, http_session):
         """Test wiki generation endpoint."""
         wiki_data = {
             "repo_url": "https://github.com/example/test-repo",
@@ -199,7 +370,7 @@ class TestGranthaAPIIntegration:
             "model": "gemini-2.0-flash-exp"
         }
         
-        response = requests.post(
+        response = http_session.post(
             f"{API_BASE_URL}/wiki/generate", 
             json=wiki_data,
             timeout=TEST_TIMEOUT
@@ -219,37 +390,8 @@ class TestGranthaAPIIntegration:
         assert "pages" in wiki
         assert len(wiki["pages"]) > 0
 
-    def test_wiki_cache_endpoint_not_implemented(self):
-        """Test wiki cache endpoint returns not implemented."""
-        cache_data = {
-            "repo_url": "https://github.com/test/repo",
-            "cache_data": {"test": "data"}
-        }
-        
-        response = requests.post(
-            f"{API_BASE_URL}/wiki/cache", 
-            json=cache_data
-        )
-        
-        # May return 422 for validation error or 501 for not implemented
-        assert response.status_code in [422, 501]
-
-    def test_wiki_export_endpoint_not_implemented(self):
-        """Test wiki export endpoint returns not implemented."""
-        export_data = {
-            "format": "markdown",
-            "pages": [{"id": "test", "title": "Test", "content": "Test"}]
-        }
-        
-        response = requests.post(
-            f"{API_BASE_URL}/wiki/export", 
-            json=export_data
-        )
-        
-        # May return 422 for validation error or 501 for not implemented
-        assert response.status_code in [422, 501]
-
-    def test_research_deep_endpoint(self):
+    @pytest.mark.llm
+    def test_research_deep_endpoint(self, http_session):
         """Test deep research endpoint."""
         research_data = {
             "query": "How does authentication work in this system?",
@@ -259,7 +401,7 @@ class TestGranthaAPIIntegration:
             "model": "gemini-2.0-flash-exp"
         }
         
-        response = requests.post(
+        response = http_session.post(
             f"{API_BASE_URL}/research/deep", 
             json=research_data,
             timeout=TEST_TIMEOUT
@@ -278,93 +420,62 @@ class TestGranthaAPIIntegration:
         assert data["query"] == research_data["query"]
         assert data["repo_url"] == research_data["repo_url"]
 
-    def test_invalid_endpoint(self):
-        """Test non-existent endpoint returns 404."""
-        response = requests.get(f"{API_BASE_URL}/nonexistent")
-        assert response.status_code == 404
+    # Latency is tracked by pytest-benchmark (compared against the stored
+    # baseline in the scheduled performance job) instead of fixed thresholds;
+    # under xdist the plugin disables itself and each call runs once
+    @pytest.mark.benchmark(group="api-latency")
+    def test_health_benchmark(self, warm_http_session, benchmark):
+        """Benchmark the health endpoint round trip."""
+        response = benchmark(warm_http_session.get, f"{API_BASE_URL}/health", timeout=1)
 
-    def test_invalid_json_payload(self):
-        """Test endpoints handle invalid JSON gracefully."""
-        response = requests.post(
-            f"{API_BASE_URL}/simple/chat", 
-            data="invalid json",
-            headers={"Content-Type": "application/json"}
-        )
-        
-        assert response.status_code == 422  # Unprocessable Entity
+        assert response.status_code == 200
 
-    def test_missing_required_fields(self):
-        """Test endpoints validate required fields."""
-        # Simple chat without required field
-        response = requests.post(
-            f"{API_BASE_URL}/simple/chat", 
-            json={"provider": "google"}  # Missing user_query
+    @pytest.mark.llm
+    @pytest.mark.benchmark(group="api-latency")
+    def test_simple_chat_benchmark(self, warm_http_session, benchmark):
+        """Benchmark a simple chat round trip."""
+        # Few rounds: each one may reach the configured LLM provider
+        response = benchmark.pedantic(
+            warm_http_session.post,
+            args=(f"{API_BASE_URL}/simple/chat",),
+            kwargs={"json": {"user_query": "Hello"}, "timeout": 10},
+            rounds=3,
+            iterations=1,
         )
-        
-        assert response.status_code == 422
-        data = response.json()
-        assert "detail" in data
 
-    def test_api_performance_benchmarks(self):
-        """Test basic API performance benchmarks."""
-        start_time = time.time()
-        
-        # Test health endpoint response time
-        response = requests.get(f"{API_BASE_URL}/health")
-        health_time = time.time() - start_time
-        
-        assert response.status_code == 200
-        assert health_time < 1.0  # Should respond within 1 second
-        
-        # Test simple chat response time
-        start_time = time.time()
-        response = requests.post(
-            f"{API_BASE_URL}/simple/chat", 
-            json={"user_query": "Hello"},
-            timeout=10
-        )
-        chat_time = time.time() - start_time
-        
         assert response.status_code == 200
-        assert chat_time < 10.0  # Should respond within 10 seconds
 
-    def test_concurrent_requests(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_concurrent_requests(self, live_client):
         """Test API handles concurrent requests properly."""
-        import concurrent.futures
-        
-        def make_request():
-            response = requests.get(f"{API_BASE_URL}/health")
-            return response.status_code == 200
-        
-        # Make 10 concurrent requests
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(make_request) for _ in range(10)]
-            results = [future.result() for future in concurrent.futures.as_completed(futures)]
+        # Make 10 concurrent requests over the session's keep-alive pool
+        responses = await asyncio.gather(*(live_client.get("/health") for _ in range(10)))
         
         # All requests should succeed
-        assert all(results)
-        assert len(results) == 10
+        assert all(r.status_code == 200 for r in responses)
+        assert len(responses) == 10
 
 
 class TestGranthaFrontendIntegration:
     """Integration tests for frontend accessibility."""
     
-    def test_frontend_accessibility(self):
+    def test_frontend_accessibility(self, http_session):
         """Test frontend is accessible."""
         try:
-            response = requests.get(FRONTEND_URL, timeout=5)
+            response = http_session.get(FRONTEND_URL, timeout=5)
             assert response.status_code == 200
             assert "grantha" in response.text.lower()
         except requests.exceptions.RequestException:
             pytest.skip("Frontend server not available")
 
-    def test_frontend_static_assets(self):
+    def test_frontend_static_assets(self, http_session):
         """Test frontend serves static assets."""
         try:
-            # Try to access favicon
-            response = requests.get(f"{FRONTEND_URL}/favicon.png", timeout=5)
-            # Should either exist (200) or not found (404), but not server error
-            assert response.status_code in [200, 404]
+            # Try to access favicon; only the status matters, so leave the
+            # image body undownloaded
+            with http_session.get(f"{FRONTEND_URL}/favicon.png", timeout=5, stream=True) as response:
+                # Should either exist (200) or not found (404), but not server error
+                assert response.status_code in [200, 404]
         except requests.exceptions.RequestException:
             pytest.skip("Frontend server not available")
 
@@ -372,18 +483,26 @@ class TestGranthaFrontendIntegration:
 class TestGranthaEndToEndWorkflows:
     """End-to-end workflow integration tests."""
     
-    def test_chat_workflow(self):
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _api_alive(cls, api_ready):
+        """Skip the class once if the API never became ready."""
+        if not api_ready:
+            pytest.skip("API server not available")
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def models_config(cls, _api_alive, http_session):
+        """Fetch the model configuration once for every workflow in the class."""
+        response = http_session.get(f"{API_BASE_URL}/models/config")
+        assert response.status_code == 200
+        return response.json()
+
+    def test_chat_workflow(self, http_session, models_config):
         """Test complete chat workflow."""
-        # 1. Check API is ready
-        health_response = requests.get(f"{API_BASE_URL}/health")
-        assert health_response.status_code == 200
-        
-        # 2. Get model configuration
-        models_response = requests.get(f"{API_BASE_URL}/models/config")
-        assert models_response.status_code == 200
-        
-        # 3. Send chat message
-        chat_response = requests.post(
+        # 1. Model configuration comes from the class-scoped fixture
+        # 2. Send chat message
+        chat_response = http_session.post(
             f"{API_BASE_URL}/simple/chat",
             json={
                 "user_query": "Explain what this API does",
@@ -398,14 +517,10 @@ class TestGranthaEndToEndWorkflows:
         assert "message" in chat_data
         assert "status" in chat_data
 
-    def test_wiki_generation_workflow(self):
+    def test_wiki_generation_workflow(self, http_session):
         """Test complete wiki generation workflow."""
-        # 1. Check auth status
-        auth_response = requests.get(f"{API_BASE_URL}/auth/status")
-        assert auth_response.status_code == 200
-        
-        # 2. Generate wiki
-        wiki_response = requests.post(
+        # Generate wiki
+        wiki_response = http_session.post(
             f"{API_BASE_URL}/wiki/generate",
             json={
                 "repo_url": "https://github.com/octocat/Hello-World",
@@ -421,14 +536,11 @@ class TestGranthaEndToEndWorkflows:
         assert "status" in wiki_data
         assert wiki_data["status"] == "success"
 
-    def test_research_workflow(self):
+    def test_research_workflow(self, http_session, models_config):
         """Test complete research workflow."""
-        # 1. Check models available
-        models_response = requests.get(f"{API_BASE_URL}/models/config")
-        assert models_response.status_code == 200
-        
+        # 1. Models available come from the class-scoped fixture
         # 2. Perform research
-        research_response = requests.post(
+        research_response = http_session.post(
             f"{API_BASE_URL}/research/deep",
             json={
                 "query": "What are the main components of this system?",
@@ -446,28 +558,26 @@ class TestGranthaEndToEndWorkflows:
 
 
 @pytest.mark.slow
+# Shares a worker with the other load tests so they don't skew each other
+@pytest.mark.xdist_group("serial")
 class TestGranthaLoadTesting:
     """Load testing for Grantha API."""
     
-    def test_sustained_load_health_endpoint(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_sustained_load_health_endpoint(self, live_client):
         """Test API under sustained load on health endpoint."""
-        import concurrent.futures
-        import time
-        
-        def make_health_request():
-            start_time = time.time()
-            response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-            end_time = time.time()
+        # One event loop keeps all 50 requests in flight over the session's
+        # keep-alive pool instead of parking a thread on each response
+        async def make_health_request():
+            start_time = time.perf_counter()
+            response = await live_client.get("/health", timeout=5.0)
             return {
                 "status_code": response.status_code,
-                "response_time": end_time - start_time,
+                "response_time": time.perf_counter() - start_time,
                 "success": response.status_code == 200
             }
         
-        # Make 50 requests with 10 concurrent workers
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(make_health_request) for _ in range(50)]
-            results = [future.result() for future in concurrent.futures.as_completed(futures)]
+        results = await asyncio.gather(*(make_health_request() for _ in range(50)))
         
         # Analyze results
         successful_requests = sum(1 for r in results if r["success"])
@@ -5,18 +5,41 @@ Integration tests for WebSocket functionality.
 import pytest
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi.testclient import TestClient
 
 from src.grantha.api.app import create_app
+from src.grantha.core.config import Config
 
 app = create_app()
 
+# Built once at import rather than on every run of the size-limit test
+_LARGE_MESSAGE = {
+    "type": "chat",
+    "content": "x" * 10_000,  # 10KB message
+    "repo_url": "https://github.com/test/repo"
+}
+
 
 @pytest.mark.integration
 class TestWebSocketEndpoints:
     """Integration test suite for WebSocket endpoints."""
     
+    @pytest.fixture(autouse=True)
+    def _mocks(self, monkeypatch):
+        """Keep Gemini and RAG, the handler's only model backends, out of every test."""
+        gemini = Mock()
+        gemini.GenerativeModel.return_value.generate_content.return_value = []
+        # Without a key the handler rejects every connection with the same
+        # "not configured" error before looking at the message
+        config = Config.for_testing(google_api_key="test_google_key")
+        
+        monkeypatch.setattr('src.grantha.api.websocket_handler.genai', gemini)
+        monkeypatch.setattr('src.grantha.api.websocket_handler.RAG', Mock())
+        monkeypatch.setattr('src.grantha.api.websocket_handler.get_config', lambda: config)
+    
     def test_websocket_connection(self):
         """Test WebSocket connection establishment."""
         with TestClient(app) as client:
@@ -38,33 +61,11 @@ class TestWebSocketEndpoints:
                     websocket.send_json(test_message)
                     
                     # Should receive response
-                    try:
-                        response = websocket.receive_json(timeout=5)
-                        assert "type" in response or "content" in response
-                    except Exception:
-                        # Timeout is acceptable in mocked test environment
-                        pass
+                    response = websocket.receive_json()
+                    assert "type" in response
 
-    @patch('src.grantha.utils.deep_research.DeepResearch')
-    def test_websocket_research_request(self, mock_deep_research):
+    def test_websocket_research_request(self):
         """Test research request via WebSocket.""" 
-        # Mock the research response
-        async def mock_research_generator():
-            yield {
-                "stage": "analysis",
-                "content": "Starting analysis...",
-                "timestamp": "2024-01-01T00:00:00"
-            }
-            yield {
-                "stage": "complete", 
-                "content": "Analysis complete",
-                "timestamp": "2024-01-01T00:01:00"
-            }
-        
-        mock_researcher_instance = Mock()
-        mock_researcher_instance.conduct_research = AsyncMock(return_value=mock_research_generator())
-        mock_deep_research.return_value = mock_researcher_instance
-        
         with TestClient(app) as client:
             with client.websocket_connect("/ws/chat") as websocket:
                 # Send research request
@@ -76,13 +77,9 @@ class TestWebSocketEndpoints:
                 }
                 websocket.send_json(research_message)
                 
-                # Should receive streaming responses
-                try:
-                    response = websocket.receive_json(timeout=5)
-                    assert "stage" in response or "content" in response
-                except Exception:
-                    # Timeout acceptable in test environment
-                    pass
+                # Should receive a protocol message back
+                response = websocket.receive_json()
+                assert "type" in response
 
     def test_websocket_invalid_message_format(self):
         """Test WebSocket with invalid message format."""
@@ -91,15 +88,10 @@ class TestWebSocketEndpoints:
                 # Send invalid message
                 websocket.send_text("invalid json")
                 
-                # Should handle gracefully or return error
-                try:
-                    response = websocket.receive_json(timeout=2)
-                    # If response received, it should indicate error
-                    if "error" in response:
-                        assert "error" in response
-                except Exception:
-                    # Connection might be closed due to invalid message
-                    pass
+                # Should be rejected with the JSON decode error
+                response = websocket.receive_json()
+                assert response["type"] == "error"
+                assert response["message"].startswith("Server error: Expecting value")
 
     def test_websocket_message_without_required_fields(self):
         """Test WebSocket message missing required fields."""
@@ -112,13 +104,12 @@ class TestWebSocketEndpoints:
                 }
                 websocket.send_json(incomplete_message)
                 
-                try:
-                    response = websocket.receive_json(timeout=2)
-                    # Should receive error response
-                    assert "error" in response or "type" in response
-                except Exception:
-                    # Acceptable in test environment
-                    pass
+                # Should fail WebSocketChatRequest validation
+                response = websocket.receive_json()
+                assert response["type"] == "error"
+                message = response["data"]["message"]
+                assert message.startswith("Invalid request format")
+                assert "repo_url" in message and "messages" in message
 
     def test_websocket_unsupported_message_type(self):
         """Test WebSocket with unsupported message type."""
@@ -131,24 +122,13 @@ class TestWebSocketEndpoints:
                 }
                 websocket.send_json(unsupported_message)
                 
-                try:
-                    response = websocket.receive_json(timeout=2)
-                    if "error" in response:
-                        assert "unsupported" in response["error"].lower()
-                except Exception:
-                    pass
+                # Unknown types fall through to WebSocketChatRequest validation
+                response = websocket.receive_json()
+                assert response["type"] == "error"
+                assert response["data"]["message"].startswith("Invalid request format")
 
-    @patch('src.grantha.utils.wiki_generator.WikiGenerator')
-    def test_websocket_wiki_generation_request(self, mock_wiki_generator):
+    def test_websocket_wiki_generation_request(self):
         """Test wiki generation request via WebSocket."""
-        # Mock wiki generator
-        mock_generator_instance = Mock()
-        mock_generator_instance.generate_wiki_structure.return_value = {
-            "title": "Test Wiki",
-            "pages": [{"id": "page1", "title": "Test Page"}]
-        }
-        mock_wiki_generator.return_value = mock_generator_instance
-        
         with TestClient(app) as client:
             with client.websocket_connect("/ws/chat") as websocket:
                 # Send wiki generation request
@@ -160,11 +140,8 @@ class TestWebSocketEndpoints:
                 }
                 websocket.send_json(wiki_message)
                 
-                try:
-                    response = websocket.receive_json(timeout=5)
-                    assert "title" in response or "pages" in response or "type" in response
-                except Exception:
-                    pass
+                response = websocket.receive_json()
+                assert "type" in response
 
     def test_websocket_connection_cleanup(self):
         """Test WebSocket connection cleanup on disconnect."""
@@ -179,32 +156,22 @@ class TestWebSocketEndpoints:
 
     def test_websocket_concurrent_connections(self):
         """Test multiple concurrent WebSocket connections."""
-        with TestClient(app) as client:
-            # Establish multiple connections
-            websockets = []
-            try:
-                for i in range(3):
-                    ws = client.websocket_connect("/ws/chat")
-                    websockets.append(ws.__enter__())
-                
-                # Send messages from each connection
-                for i, ws in enumerate(websockets):
-                    test_message = {
-                        "type": "chat",
-                        "content": f"Message from connection {i}"
-                    }
-                    ws.send_json(test_message)
-                
-                # All connections should work independently
-                assert len(websockets) == 3
-                
-            finally:
-                # Clean up connections
-                for ws in websockets:
-                    try:
-                        ws.__exit__(None, None, None)
-                    except:
-                        pass
+        with TestClient(app) as client, ExitStack() as stack:
+            def connect_and_send(i):
+                # The stack closes every connection, even if one handshake fails
+                ws = stack.enter_context(client.websocket_connect("/ws/chat"))
+                ws.send_json({
+                    "type": "chat",
+                    "content": f"Message from connection {i}"
+                })
+                return ws
+            
+            # Establish the connections in parallel so the handshakes overlap
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                websockets = list(executor.map(connect_and_send, range(3)))
+            
+            # All connections should work independently
+            assert len(websockets) == 3
 
     @patch('src.grantha.api.websocket_handler.logger')
     def test_websocket_error_handling(self, mock_logger):
@@ -214,53 +181,51 @@ class TestWebSocketEndpoints:
                 # Send malformed JSON
                 websocket.send_text("{invalid json")
                 
-                # Should log error (in actual implementation)
-                # In test, just verify connection remains stable
-                try:
-                    websocket.send_json({"type": "ping"})
-                except Exception:
-                    # Connection might be closed, which is acceptable
-                    pass
+                # Should report the error instead of dropping the connection
+                response = websocket.receive_json()
+                assert response["type"] == "error"
+                assert response["message"].startswith("Server error: Expecting property name")
+        
+        mock_logger.error.assert_called()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_websocket_async_message_handling(self):
         """Test asynchronous message handling in WebSocket."""
-        # This would test the actual async implementation
-        # For now, just verify the endpoint exists and is accessible
-        from src.grantha.api.websocket_handler import handle_websocket_chat
+        from fastapi import WebSocketDisconnect
+        from src.grantha.api import websocket_handler
         
-        # Mock WebSocket connection
+        # The patched Gemini model streams a single chunk back
+        model = websocket_handler.genai.GenerativeModel.return_value
+        model.generate_content.return_value = [Mock(text="It serves a REST API.")]
+        
+        # One valid chat request, then the client goes away
         mock_websocket = AsyncMock()
-        mock_websocket.receive_text.return_value = '{"type": "ping"}'
-        mock_websocket.send_text = AsyncMock()
+        mock_websocket.receive_json.side_effect = [
+            {
+                "repo_url": "https://github.com/test/repo",
+                "messages": [{"role": "user", "content": "How does this API work?"}]
+            },
+            WebSocketDisconnect(),
+        ]
+        
+        await websocket_handler.handle_websocket_chat(mock_websocket)
         
-        # Test that handler can be called (implementation-specific test)
-        try:
-            await handle_websocket_chat(mock_websocket)
-        except Exception as e:
-            # Expected to fail without proper setup, but function should exist
-            assert "handle_websocket_chat" in str(type(e).__name__) or True
+        # The streamed answer goes out as text and no error is reported
+        mock_websocket.send_text.assert_awaited_once_with("It serves a REST API.")
+        mock_websocket.send_json.assert_not_awaited()
+        mock_websocket.close.assert_awaited()
+        prompt = model.generate_content.call_args.args[0]
+        assert "How does this API work?" in prompt
 
     def test_websocket_message_size_limits(self):
         """Test WebSocket message size handling."""
         with TestClient(app) as client:
             with client.websocket_connect("/ws/chat") as websocket:
                 # Send very large message
-                large_content = "x" * 10000  # 10KB message
-                large_message = {
-                    "type": "chat",
-                    "content": large_content,
-                    "repo_url": "https://github.com/test/repo"
-                }
-                
-                try:
-                    websocket.send_json(large_message)
-                    # Should either accept or reject gracefully
-                    response = websocket.receive_json(timeout=5)
-                    assert response is not None
-                except Exception:
-                    # Size limits may cause connection issues
-                    pass
+                websocket.send_json(_LARGE_MESSAGE)
+                # Should either accept or reject gracefully
+                response = websocket.receive_json()
+                assert "type" in response
 
     def test_websocket_authentication_if_enabled(self):
         """Test WebSocket authentication when auth is enabled."""
@@ -278,8 +243,5 @@ class TestWebSocketEndpoints:
                     })
                     
                     # May receive auth error or be handled differently
-                    try:
-                        response = websocket.receive_json(timeout=2)
-                        # Implementation-specific behavior
-                    except Exception:
-                        pass
\ No newline at end of file
+                    response = websocket.receive_json()
+                    assert "type" in response
\ No newline at end of file
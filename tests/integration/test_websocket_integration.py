@@ -5,7 +5,8 @@ Tests real-time communication functionality.
 
 import pytest
 import asyncio
-import json
+import time
+import orjson
 import websockets
 import requests
 from typing import Dict, Any
@@ -16,18 +17,28 @@ API_BASE_URL = "http://localhost:8000"
 TEST_TIMEOUT = 30
 
 
+def _dumps(message: Dict[str, Any]) -> str:
+    """Serialize a message into a text frame payload with orjson."""
+    return orjson.dumps(message).decode()
+
+
+@pytest.fixture(scope="session")
+def api_available(http_session):
+    """Probe the API health endpoint once per session."""
+    try:
+        response = http_session.get(f"{API_BASE_URL}/health", timeout=5)
+    except requests.exceptions.RequestException:
+        return False
+    return response.status_code == 200
+
+
 class TestWebSocketIntegration:
     """Integration tests for WebSocket functionality."""
     
     @pytest.fixture(autouse=True)
-    def setup_method(self):
-        """Setup method run before each test."""
-        # Check if API is available
-        try:
-            response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-            if response.status_code != 200:
-                pytest.skip("API server not available")
-        except requests.exceptions.RequestException:
+    def _require_api(self, api_available):
+        """Skip when the cached health probe found no API server."""
+        if not api_available:
             pytest.skip("API server not available")
 
     @pytest.mark.asyncio
@@ -38,12 +49,12 @@ class TestWebSocketIntegration:
             # Note: This assumes there's a WebSocket endpoint at /ws
             async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=10) as websocket:
                 # Send a ping to verify connection
-                await websocket.send(json.dumps({"type": "ping"}))
+                await websocket.send(_dumps({"type": "ping"}))
                 
                 # Wait for response with timeout
                 try:
                     response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                    data = json.loads(response)
+                    data = orjson.loads(response)
                     assert "type" in data or "status" in data
                 except asyncio.TimeoutError:
                     # Timeout is acceptable if WebSocket isn't fully implemented
@@ -67,12 +78,12 @@ class TestWebSocketIntegration:
                     "user_id": "test_user"
                 }
                 
-                await websocket.send(json.dumps(chat_message))
+                await websocket.send(_dumps(chat_message))
                 
                 # Wait for response
                 try:
                     response = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-                    data = json.loads(response)
+                    data = orjson.loads(response)
                     
                     # Should receive chat response
                     assert "type" in data
@@ -113,7 +124,7 @@ class TestWebSocketIntegration:
                     "content": f"Message from connection {i}",
                     "connection_id": i
                 }
-                task = conn.send(json.dumps(message))
+                task = conn.send(_dumps(message))
                 tasks.append(task)
             
             # Wait for all sends to complete
@@ -139,14 +150,14 @@ class TestWebSocketIntegration:
                 
                 try:
                     response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                    data = json.loads(response)
+                    data = orjson.loads(response)
                     
                     # Should receive error response
                     if "error" in data:
                         assert "error" in data
                         assert "invalid" in data["error"].lower()
                         
-                except (asyncio.TimeoutError, json.JSONDecodeError):
+                except (asyncio.TimeoutError, orjson.JSONDecodeError):
                     # Connection might be closed or no response
                     pass
                     
@@ -160,7 +171,9 @@ class TestWebSocketIntegration:
     async def test_websocket_large_message_handling(self):
         """Test WebSocket handling of large messages."""
         try:
-            async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=10) as websocket:
+            async with websockets.connect(
+                f"{WS_BASE_URL}/ws", timeout=10, compression=None
+            ) as websocket:
                 # Send large message
                 large_content = "x" * 10000  # 10KB message
                 large_message = {
@@ -169,7 +182,7 @@ class TestWebSocketIntegration:
                     "size": len(large_content)
                 }
                 
-                await websocket.send(json.dumps(large_message))
+                await websocket.send(_dumps(large_message))
                 
                 try:
                     response = await asyncio.wait_for(websocket.recv(), timeout=10.0)
@@ -195,20 +208,20 @@ class TestWebSocketPerformance:
     async def test_websocket_connection_performance(self):
         """Test WebSocket connection establishment performance."""
         try:
-            connection_times = []
-            
-            for _ in range(10):
-                import time
-                start_time = time.time()
-                
-                try:
-                    async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=5) as websocket:
-                        # Send ping to verify connection
-                        await websocket.send(json.dumps({"type": "ping"}))
-                        connection_time = time.time() - start_time
-                        connection_times.append(connection_time)
-                except Exception:
-                    break
+            loop = asyncio.get_running_loop()
+
+            async def timed_connect():
+                start_time = loop.time()
+                async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=5) as websocket:
+                    # Send ping to verify connection
+                    await websocket.send(_dumps({"type": "ping"}))
+                    return loop.time() - start_time
+
+            # Handshakes are I/O-bound, so overlap them on the event loop
+            results = await asyncio.gather(
+                *(timed_connect() for _ in range(10)), return_exceptions=True
+            )
+            connection_times = [t for t in results if not isinstance(t, BaseException)]
             
             if connection_times:
                 avg_connection_time = sum(connection_times) / len(connection_times)
@@ -228,8 +241,12 @@ class TestWebSocketPerformance:
     async def test_websocket_message_throughput(self):
         """Test WebSocket message throughput."""
         try:
-            async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=10) as websocket:
-                import time
+            # No permessage-deflate: the client would otherwise spend the
+            # measured time compressing frames. Payloads stay text frames
+            # because the handler reads them with receive_json() in text mode.
+            async with websockets.connect(
+                f"{WS_BASE_URL}/ws", timeout=10, compression=None
+            ) as websocket:
                 start_time = time.time()
                 message_count = 50
                 
@@ -240,7 +257,7 @@ class TestWebSocketPerformance:
                         "message_id": i,
                         "content": f"Test message {i}"
                     }
-                    await websocket.send(json.dumps(message))
+                    await websocket.send(_dumps(message))
                 
                 end_time = time.time()
                 total_time = end_time - start_time
@@ -265,12 +282,12 @@ class TestWebSocketResilience:
         try:
             # First connection
             conn1 = await websockets.connect(f"{WS_BASE_URL}/ws", timeout=5)
-            await conn1.send(json.dumps({"type": "test", "connection": 1}))
+            await conn1.send(_dumps({"type": "test", "connection": 1}))
             await conn1.close()
             
             # Second connection after disconnect
             conn2 = await websockets.connect(f"{WS_BASE_URL}/ws", timeout=5)
-            await conn2.send(json.dumps({"type": "test", "connection": 2}))
+            await conn2.send(_dumps({"type": "test", "connection": 2}))
             await conn2.close()
             
             # Should be able to reconnect successfully
@@ -288,10 +305,10 @@ class TestWebSocketResilience:
         try:
             async with websockets.connect(f"{WS_BASE_URL}/ws", timeout=10) as websocket:
                 # Send invalid message type
-                await websocket.send(json.dumps({"type": "invalid_type"}))
+                await websocket.send(_dumps({"type": "invalid_type"}))
                 
                 # Send valid message after invalid one
-                await websocket.send(json.dumps({"type": "ping"}))
+                await websocket.send(_dumps({"type": "ping"}))
                 
                 # Connection should remain stable
                 try:
@@ -3,33 +3,112 @@ Performance tests for Grantha API endpoints.
 """
 
 import pytest
+import pytest_asyncio
+import statistics
 import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import httpx
+import orjson
 from unittest.mock import patch, Mock
-from fastapi.testclient import TestClient
 
 from api.api import app
 
 
-@pytest.fixture
-def perf_client():
-    """Create test client for performance testing."""
-    return TestClient(app)
+# Large request bodies, built and serialized once at import so the tests
+# (and the memory measurement) only pay for the request itself
+_JSON_HEADERS = {"content-type": "application/json"}
+
+_LARGE_EXPORT_REQUEST = orjson.dumps({
+    "repo_url": "https://github.com/test/large-repo",
+    "format": "json",
+    "pages": [
+        {
+            "id": f"page_{i}",
+            "title": f"Test Page {i}",
+            "content": "x" * 1000,  # 1KB content per page
+            "filePaths": [f"file_{i}.py"],
+            "importance": "medium",
+            "relatedPages": []
+        }
+        for i in range(100)  # 100 pages
+    ]
+})
+
+_LARGE_CONTENT_EXPORT_REQUEST = orjson.dumps({
+    "repo_url": "https://github.com/test/large-content",
+    "format": "markdown",
+    "pages": [{
+        "id": "large_page",
+        "title": "Large Page",
+        "content": "# Large Document\n\n" + ("This is repeated content. " * 1000),
+        "filePaths": ["large_file.py"],
+        "importance": "high",
+        "relatedPages": []
+    }]
+})
+
+_WIKI_CACHE_REQUEST = orjson.dumps({
+    "repo": {
+        "owner": "test",
+        "repo": "memory-test",
+        "type": "github",
+        "repoUrl": "https://github.com/test/memory-test"
+    },
+    "language": "en",
+    "wiki_structure": {
+        "id": "test_wiki",
+        "title": "Memory Test Wiki",
+        "description": "Testing memory usage",
+        "pages": [
+            {
+                "id": f"page_{i}",
+                "title": f"Page {i}",
+                "content": "x" * 500,  # 500 bytes per page
+                "filePaths": [f"file_{i}.py"],
+                "importance": "medium",
+                "relatedPages": []
+            }
+            for i in range(50)  # 50 pages
+        ],
+        "sections": [],
+        "rootSections": []
+    },
+    "generated_pages": {},
+    "provider": "google",
+    "model": "gemini-2.5-flash"
+})
+
+
+async def _chunked(body, chunk_size=64 * 1024):
+    """Stream a serialized body to the client in 64 KiB slices."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def perf_client():
+    """Create one in-process ASGI client shared by the performance tests."""
+    # Unlike TestClient this doesn't bridge every request through a portal
+    # thread, so timings measure the app and gathered requests overlap
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
 
 
 @pytest.mark.slow
 @pytest.mark.performance
+@pytest.mark.asyncio(loop_scope="session")
 class TestAPIPerformance:
     """Performance test suite for API endpoints."""
     
-    def test_health_endpoint_response_time(self, perf_client):
+    async def test_health_endpoint_response_time(self, perf_client):
         """Test health endpoint response time."""
         # Warm up
-        perf_client.get("/health")
+        await perf_client.get("/health")
         
         start_time = time.time()
-        response = perf_client.get("/health")
+        response = await perf_client.get("/health")
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -37,13 +116,13 @@ class TestAPIPerformance:
         assert response.status_code == 200
         assert response_time < 0.1  # Should respond within 100ms
         
-    def test_root_endpoint_response_time(self, perf_client):
+    async def test_root_endpoint_response_time(self, perf_client):
         """Test root endpoint response time."""
         # Warm up
-        perf_client.get("/")
+        await perf_client.get("/")
         
         start_time = time.time()
-        response = perf_client.get("/")
+        response = await perf_client.get("/")
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -51,13 +130,13 @@ class TestAPIPerformance:
         assert response.status_code == 200
         assert response_time < 0.2  # Should respond within 200ms
         
-    def test_models_config_endpoint_response_time(self, perf_client):
+    async def test_models_config_endpoint_response_time(self, perf_client):
         """Test models config endpoint response time."""
         # Warm up
-        perf_client.get("/models/config")
+        await perf_client.get("/models/config")
         
         start_time = time.time()
-        response = perf_client.get("/models/config")
+        response = await perf_client.get("/models/config")
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -65,17 +144,12 @@ class TestAPIPerformance:
         assert response.status_code == 200
         assert response_time < 0.5  # Configuration loading should be fast
         
-    def test_concurrent_health_checks(self, perf_client):
+    async def test_concurrent_health_checks(self, perf_client):
         """Test concurrent health check requests."""
-        def make_request():
-            return perf_client.get("/health")
-        
         # Test with 10 concurrent requests
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            start_time = time.time()
-            futures = [executor.submit(make_request) for _ in range(10)]
-            responses = [future.result() for future in futures]
-            end_time = time.time()
+        start_time = time.time()
+        responses = await asyncio.gather(*(perf_client.get("/health") for _ in range(10)))
+        end_time = time.time()
         
         total_time = end_time - start_time
         
@@ -85,7 +159,7 @@ class TestAPIPerformance:
         # Total time should be reasonable for 10 concurrent requests
         assert total_time < 2.0
         
-    def test_wiki_cache_performance(self, perf_client):
+    async def test_wiki_cache_performance(self, perf_client):
         """Test wiki cache retrieval performance."""
         params = {
             "owner": "testuser",
@@ -95,10 +169,10 @@ class TestAPIPerformance:
         }
         
         # Warm up
-        perf_client.get("/api/wiki_cache", params=params)
+        await perf_client.get("/api/wiki_cache", params=params)
         
         start_time = time.time()
-        response = perf_client.get("/api/wiki_cache", params=params)
+        response = await perf_client.get("/api/wiki_cache", params=params)
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -108,7 +182,7 @@ class TestAPIPerformance:
         
     @patch('api.api.WikiGenerator')
     @patch('api.api.download_repo')
-    def test_wiki_generation_performance(self, mock_download, mock_wiki_gen, perf_client):
+    async def test_wiki_generation_performance(self, mock_download, mock_wiki_gen, perf_client):
         """Test wiki generation performance."""
         # Mock dependencies to avoid actual processing
         mock_download.return_value = "/tmp/test_repo"
@@ -127,7 +201,7 @@ class TestAPIPerformance:
         }
         
         start_time = time.time()
-        response = perf_client.post("/api/wiki/generate", json=request_data)
+        response = await perf_client.post("/api/wiki/generate", json=request_data)
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -136,28 +210,14 @@ class TestAPIPerformance:
         # Mocked generation should be fast
         assert response_time < 2.0
         
-    def test_large_payload_handling(self, perf_client):
-        """Test handling of large request payloads.""" 
-        # Create large wiki data payload
-        large_pages = []
-        for i in range(100):  # 100 pages
-            large_pages.append({
-                "id": f"page_{i}",
-                "title": f"Test Page {i}",
-                "content": "x" * 1000,  # 1KB content per page
-                "filePaths": [f"file_{i}.py"],
-                "importance": "medium",
-                "relatedPages": []
-            })
-        
-        export_request = {
-            "repo_url": "https://github.com/test/large-repo",
-            "format": "json",
-            "pages": large_pages
-        }
-        
+    async def test_large_payload_handling(self, perf_client):
+        """Test handling of large request payloads."""
         start_time = time.time()
-        response = perf_client.post("/export/wiki", json=export_request)
+        # Chunked upload: httpx streams the slices instead of holding
+        # another copy of the whole body for the request
+        response = await perf_client.post(
+            "/export/wiki", content=_chunked(_LARGE_EXPORT_REQUEST), headers=_JSON_HEADERS
+        )
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -165,87 +225,36 @@ class TestAPIPerformance:
         assert response.status_code == 200
         assert response_time < 5.0  # Should handle large payloads reasonably fast
         
-    def test_memory_usage_wiki_cache_storage(self, perf_client):
+    async def test_memory_usage_wiki_cache_storage(self, perf_client):
         """Test memory usage during wiki cache storage."""
-        import tracemalloc
-        
-        # Start tracing memory
-        tracemalloc.start()
-        
-        cache_data = {
-            "repo": {
-                "owner": "test",
-                "repo": "memory-test",
-                "type": "github",
-                "repoUrl": "https://github.com/test/memory-test"
-            },
-            "language": "en",
-            "wiki_structure": {
-                "id": "test_wiki",
-                "title": "Memory Test Wiki",
-                "description": "Testing memory usage",
-                "pages": [
-                    {
-                        "id": f"page_{i}",
-                        "title": f"Page {i}",
-                        "content": "x" * 500,  # 500 bytes per page
-                        "filePaths": [f"file_{i}.py"],
-                        "importance": "medium",
-                        "relatedPages": []
-                    }
-                    for i in range(50)  # 50 pages
-                ],
-                "sections": [],
-                "rootSections": []
-            },
-            "generated_pages": {},
-            "provider": "google",
-            "model": "gemini-2.5-flash"
-        }
+        psutil = pytest.importorskip("psutil")
+        process = psutil.Process()
         
         with patch('api.api.save_wiki_cache') as mock_save:
             mock_save.return_value = True
             
-            # Measure memory before
-            snapshot1 = tracemalloc.take_snapshot()
-            
-            response = perf_client.post("/api/wiki_cache", json=cache_data)
+            # Measure current RSS before and after; unlike tracemalloc this
+            # adds no per-allocation bookkeeping to the measured request
+            rss_before = process.memory_info().rss
             
-            # Measure memory after
-            snapshot2 = tracemalloc.take_snapshot()
+            response = await perf_client.post(
+                "/api/wiki_cache", content=_WIKI_CACHE_REQUEST, headers=_JSON_HEADERS
+            )
             
-        # Stop tracing
-        tracemalloc.stop()
+            rss_after = process.memory_info().rss
         
         assert response.status_code == 200
         
-        # Calculate memory difference
-        top_stats = snapshot2.compare_to(snapshot1, 'lineno')
-        total_memory_diff = sum(stat.size_diff for stat in top_stats)
+        total_memory_diff = rss_after - rss_before
         
         # Memory increase should be reasonable (less than 10MB for this test)
         assert total_memory_diff < 10 * 1024 * 1024
         
-    def test_response_compression_efficiency(self, perf_client):
+    async def test_response_compression_efficiency(self, perf_client):
         """Test response size for large content."""
-        # Create large export request
-        large_content = "# Large Document\n\n" + ("This is repeated content. " * 1000)
-        large_pages = [{
-            "id": "large_page",
-            "title": "Large Page",
-            "content": large_content,
-            "filePaths": ["large_file.py"],
-            "importance": "high",
-            "relatedPages": []
-        }]
-        
-        export_request = {
-            "repo_url": "https://github.com/test/large-content",
-            "format": "markdown",
-            "pages": large_pages
-        }
-        
-        response = perf_client.post("/export/wiki", json=export_request)
+        response = await perf_client.post(
+            "/export/wiki", content=_LARGE_CONTENT_EXPORT_REQUEST, headers=_JSON_HEADERS
+        )
         
         assert response.status_code == 200
         
@@ -257,18 +266,18 @@ class TestAPIPerformance:
         if "content-encoding" in response.headers:
             assert response.headers["content-encoding"] in ["gzip", "br", "deflate"]
             
-    def test_api_rate_limiting_behavior(self, perf_client):
+    async def test_api_rate_limiting_behavior(self, perf_client):
         """Test API behavior under rapid requests."""
-        def make_rapid_requests():
+        async def make_rapid_requests():
             responses = []
             for i in range(20):  # 20 rapid requests
-                response = perf_client.get("/health")
+                response = await perf_client.get("/health")
                 responses.append(response)
-                time.sleep(0.05)  # 50ms between requests
+                await asyncio.sleep(0.05)  # 50ms between requests
             return responses
         
         start_time = time.time()
-        responses = make_rapid_requests()
+        responses = await make_rapid_requests()
         end_time = time.time()
         
         total_time = end_time - start_time
@@ -280,14 +289,11 @@ class TestAPIPerformance:
         # Should complete within reasonable time
         assert total_time < 5.0
         
-    @pytest.mark.asyncio
     async def test_async_endpoint_performance(self, perf_client):
         """Test asynchronous endpoint performance."""
         async def make_async_request():
-            # Simulate async operation timing
             start = time.time()
-            # Using sync client in async context for testing
-            response = perf_client.get("/models/config")
+            response = await perf_client.get("/models/config")
             end = time.time()
             return response, end - start
         
@@ -304,7 +310,7 @@ class TestAPIPerformance:
         avg_time = sum(times) / len(times)
         assert avg_time < 1.0
         
-    def test_database_connection_performance(self, perf_client):
+    async def test_database_connection_performance(self, perf_client):
         """Test database/cache connection performance."""
         # Test rapid cache access
         params = {
@@ -314,23 +320,30 @@ class TestAPIPerformance:
             "language": "en"
         }
         
-        times = []
-        for _ in range(10):
-            start_time = time.time()
-            response = perf_client.get("/api/wiki_cache", params=params)
-            end_time = time.time()
-            
-            assert response.status_code == 200
-            times.append(end_time - start_time)
+        loop = asyncio.get_running_loop()
+        
+        async def timed_request():
+            start_time = loop.time()
+            response = await perf_client.get("/api/wiki_cache", params=params)
+            return response, loop.time() - start_time
+        
+        # Issue the lookups concurrently so the timings also show how the
+        # cache path holds up under overlapping requests
+        results = await asyncio.gather(*(timed_request() for _ in range(10)))
+        responses, times = zip(*results)
+        
+        assert all(r.status_code == 200 for r in responses)
         
         # Cache access should be consistently fast
-        avg_time = sum(times) / len(times)
+        avg_time = statistics.mean(times)
         max_time = max(times)
+        p50_time = statistics.median(times)
         
         assert avg_time < 0.5
         assert max_time < 1.0
+        assert p50_time < 0.1
         
-    def test_processed_projects_listing_performance(self, perf_client):
+    async def test_processed_projects_listing_performance(self, perf_client):
         """Test processed projects listing performance."""
         with patch('os.listdir') as mock_listdir:
             # Mock many cache files
@@ -344,7 +357,7 @@ class TestAPIPerformance:
                 mock_stat.return_value = Mock(st_mtime=time.time())
                 
                 start_time = time.time()
-                response = perf_client.get("/api/processed_projects")
+                response = await perf_client.get("/api/processed_projects")
                 end_time = time.time()
                 
                 response_time = end_time - start_time
@@ -3,6 +3,7 @@ Test utilities and helper functions.
 """
 
 import json
+import orjson
 import tempfile
 import shutil
 from pathlib import Path
@@ -300,6 +301,11 @@ class AsyncMockContext:
         pass
 
 
+def rjson(response) -> Any:
+    """Decode an HTTP response body with orjson instead of response.json()."""
+    return orjson.loads(response.content)
+
+
 def assert_valid_wiki_structure(wiki_structure: Dict[Any, Any]):
     """Assert that wiki structure is valid."""
     assert "title" in wiki_structure